@@ -2,43 +2,141 @@
 
 from __future__ import annotations
 
+import atexit
 import json
+import queue
+import threading
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Set
 import datetime as _dt
 
+try:
+    # Optional: faster JSON for log lines (same as config.py)
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
 # Base directory = repo root (same idea as in config.py)
 ROOT_DIR = Path(__file__).resolve().parent.parent
 LOG_DIR = ROOT_DIR / "logs"
 LOG_FILE = LOG_DIR / "activity.log"
 
+# Serialized log lines waiting for the writer thread (see log_event)
+_LOG_QUEUE: "queue.Queue[str]" = queue.Queue()
+_WRITER: Optional[threading.Thread] = None
+_WRITER_LOCK = threading.Lock()
+# Most lines appended per open() of the log file
+_MAX_BATCH = 256
+
+# Event types that log_event() drops before building an entry,
+# e.g. {"APP_STATUS_EXPLAINED", "PROFILE_RULE_APPLIED"} for noisy batch runs.
+DISABLED_EVENTS: Set[str] = set()
+
 
 def _now_iso() -> str:
     """Return current UTC time as ISO string (seconds precision)."""
-    return _dt.datetime.utcnow().isoformat(timespec="seconds")
+    return _dt.datetime.now(_dt.timezone.utc).isoformat(timespec="seconds")
 
 
-def log_event(event_type: str, message: str, extra: Dict[str, Any] | None = None) -> None:
+def _writer_loop() -> None:
+    """Append queued lines to LOG_FILE, in batches, for the life of the process."""
+    while True:
+        lines = [_LOG_QUEUE.get()]
+        try:
+            while len(lines) < _MAX_BATCH:
+                lines.append(_LOG_QUEUE.get_nowait())
+        except queue.Empty:
+            pass
+
+        try:
+            LOG_DIR.mkdir(parents=True, exist_ok=True)
+            with LOG_FILE.open("a", encoding="utf-8") as f:
+                f.write("".join(lines))
+        except Exception as exc:
+            # Logging should never crash the app; just print a warning.
+            print(f"[activity_log] Failed to write {len(lines)} log entries: {exc}")
+        finally:
+            for _ in lines:
+                _LOG_QUEUE.task_done()
+
+
+def _ensure_writer() -> None:
+    """Start the background writer thread on first use."""
+    global _WRITER
+    if _WRITER is not None:
+        return
+    with _WRITER_LOCK:
+        if _WRITER is None:
+            writer = threading.Thread(target=_writer_loop, name="activity-log-writer", daemon=True)
+            writer.start()
+            _WRITER = writer
+            atexit.register(flush)
+
+
+def flush() -> None:
+    """Block until every entry passed to log_event() has been written."""
+    if _WRITER is not None:
+        _LOG_QUEUE.join()
+
+
+class LazyMessage:
+    """
+    Log message formatted with % only when the entry is actually built:
+    LazyMessage("Blocked %s (%s)", exe_path, d).
+    """
+    __slots__ = ("fmt", "args")
+
+    def __init__(self, fmt: str, *args: Any) -> None:
+        self.fmt = fmt
+        self.args = args
+
+    def __str__(self) -> str:
+        return self.fmt % self.args
+
+
+def is_event_enabled(event_type: str) -> bool:
+    """True if log_event(event_type, ...) would write an entry."""
+    return event_type not in DISABLED_EVENTS
+
+
+def log_event(
+    event_type: str,
+    message: str | LazyMessage,
+    extra: Dict[str, Any] | None = None,
+) -> None:
     """
     Append a log entry to logs/activity.log.
     Format per line (JSON):
       {"timestamp": "...", "event_type": "...", "message": "...", "extra": {...}}
+
+    Event types in DISABLED_EVENTS are dropped before the message is
+    formatted; hot paths pass a LazyMessage (and check is_event_enabled()
+    before building a large extra dict).
+
+    The entry is serialized right away but written by a background thread,
+    so callers never wait on disk I/O. Call flush() to wait for the writes.
     """
-    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    if event_type in DISABLED_EVENTS:
+        return
 
     entry = {
       "timestamp": _now_iso(),
       "event_type": event_type,
-      "message": message,
+      "message": str(message),
       "extra": extra or {},
     }
 
     try:
-        with LOG_FILE.open("a", encoding="utf-8") as f:
-            f.write(json.dumps(entry) + "\n")
+        if orjson is not None:
+            line = orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE).decode("utf-8")
+        else:
+            line = json.dumps(entry) + "\n"
     except Exception as exc:
-        # Logging should never crash the app; just print a warning.
-        print(f"[activity_log] Failed to write log entry: {exc}")
+        print(f"[activity_log] Failed to serialize log entry: {exc}")
+        return
+
+    _ensure_writer()
+    _LOG_QUEUE.put(line)
 
 
 def get_recent_events(limit: int = 100) -> List[Dict[str, Any]]:
@@ -46,6 +144,8 @@ def get_recent_events(limit: int = 100) -> List[Dict[str, Any]]:
     Read up to 'limit' most recent events from the log file and return as dicts.
     If the file doesn't exist yet, return an empty list.
     """
+    flush()  # include entries still waiting for the writer thread
+
     if not LOG_FILE.exists():
         return []
 
@@ -58,13 +158,15 @@ def get_recent_events(limit: int = 100) -> List[Dict[str, Any]]:
         print(f"[activity_log] Failed to read log file: {exc}")
         return []
 
+    loads = orjson.loads if orjson is not None else json.loads
+
     # Take last 'limit' lines
     for line in lines[-limit:]:
         line = line.strip()
         if not line:
             continue
         try:
-            evt = json.loads(line)
+            evt = loads(line)
             events.append(evt)
         except json.JSONDecodeError:
             # Skip malformed lines
@@ -2,21 +2,56 @@
 
 from __future__ import annotations
 
+import contextlib
 import json
+import math
+import os
+import sys
+import tempfile
+import threading
 from json import JSONDecodeError
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import datetime as _dt
 
 from .models import FullConfig, AppInfo, ProfileConfig, AppRule, Action, Direction
 
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None  # type: ignore[assignment]
+
 # Repo root (same style as activity_log.py)
 ROOT_DIR = Path(__file__).resolve().parent.parent
 CONFIG_PATH = ROOT_DIR / "config.json"
+# Binary mirror of config.json (only written when msgspec is installed).
+# config.json stays the human-editable source of truth: the mirror records the
+# (st_size, st_mtime_ns) of the config.json it was written alongside and is
+# only used while config.json still has exactly that stamp.
+MSGPACK_PATH = ROOT_DIR / "config.msgpack"
+# Sidecar recording "<profile name>\n<digest>" of the last profile that
+# profiles.apply_profile() pushed to Windows Firewall. Removed by any other
+# change to the FWAssist_* rules (see firewall_win._invalidate_last_sync()).
+LAST_SYNC_PATH = ROOT_DIR / ".last_sync"
+
+# (st_mtime_ns, st_size, parsed FullConfig) of the last config.json load.
+# See _cached_load(); cleared by save_raw_config().
+_CONFIG_CACHE: Optional[Tuple[int, int, FullConfig]] = None
+
+# Serializes saves (and whole mutate_config() blocks) between the UI thread
+# and the background firewall sync.
+_CONFIG_LOCK = threading.RLock()
 
 
 def _default_raw_config() -> Dict[str, Any]:
     """
-    Default config structure as plain dict (matches JSON).
+    Return the default config structure as a plain dict (matches JSON).
+    Built fresh on every call, so callers may change the result freely.
     """
     return {
         "version": 1,
@@ -45,6 +80,145 @@ def _default_raw_config() -> Dict[str, Any]:
     }
 
 
+# Canonical Direction string objects. _normalize_direction (like
+# _normalize_action, which returns literals) always returns these exact
+# objects, so later `rule.direction == "both"` style checks across the app
+# hit CPython's identity fast path instead of comparing characters.
+_CANONICAL_DIRECTIONS: Dict[Any, Direction] = {"in": "in", "out": "out", "both": "both"}
+
+
+def _as_tag_list(value: Any) -> List[str]:
+    """Freshly parsed JSON lists are ours to keep; only copy other iterables."""
+    return value if type(value) is list else list(value or ())
+
+
+def _normalize_action(value: Any) -> Action:
+    """Anything other than "block" is treated as "allow"."""
+    return "block" if value == "block" else "allow"
+
+
+def _normalize_direction(value: Any) -> Direction:
+    """Return the canonical Direction for value, defaulting to "out"."""
+    try:
+        return _CANONICAL_DIRECTIONS[value]
+    except (KeyError, TypeError):
+        return _CANONICAL_DIRECTIONS.get(str(value or "out").lower(), "out")
+
+
+def _temporary_until_epoch(rule_data: Dict[str, Any]) -> Optional[int]:
+    """
+    Read a rule's temporary allow end as Unix time.
+
+    Older configs stored an ISO string under "temporary_until" (naive
+    values are UTC); it is converted here and written back as
+    "temporary_until_epoch" on the next save. Malformed values become None.
+    """
+    epoch = rule_data.get("temporary_until_epoch")
+    if epoch is not None:
+        # The stdlib json module accepts NaN/Infinity: reject those (and other
+        # non-numbers) here instead of letting int() raise on them.
+        if isinstance(epoch, bool) or not isinstance(epoch, (int, float)):
+            return None
+        if not math.isfinite(epoch):
+            return None
+        try:
+            # Out-of-range values would otherwise fail later, in AppRule.temporary_until
+            _dt.datetime.fromtimestamp(epoch, _dt.timezone.utc)
+        except (OverflowError, OSError, ValueError):
+            return None
+        return int(epoch)
+
+    legacy = rule_data.get("temporary_until")
+    if not legacy:
+        return None
+    try:
+        until = _dt.datetime.fromisoformat(legacy)
+        if until.tzinfo is None:
+            until = until.replace(tzinfo=_dt.timezone.utc)
+        return int(until.timestamp())
+    except (TypeError, ValueError, OverflowError, OSError):
+        return None
+
+
+# Errors _json_loads() raises for malformed JSON (orjson.JSONDecodeError
+# subclasses json.JSONDecodeError)
+_JSON_DECODE_ERRORS: Tuple[type, ...] = (JSONDecodeError,)
+if msgspec is not None:
+    _JSON_DECODE_ERRORS += (msgspec.DecodeError,)
+
+
+def _json_loads(data: bytes) -> Any:
+    """Parse JSON bytes (orjson or msgspec if available, else stdlib json)."""
+    if orjson is not None:
+        return orjson.loads(data)
+    if msgspec is not None:
+        return msgspec.json.decode(data)
+    return json.loads(data.decode("utf-8"))
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize obj as pretty-printed (2-space indent) UTF-8 JSON bytes with trailing newline."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    if msgspec is not None:
+        return msgspec.json.format(msgspec.json.encode(obj), indent=2) + b"\n"
+    return (json.dumps(obj, indent=2, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+def _config_stamp() -> List[int]:
+    """Return [st_size, st_mtime_ns] of config.json (raises OSError if missing)."""
+    st = CONFIG_PATH.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _load_msgpack_mirror() -> Dict[str, Any] | None:
+    """
+    Return the config stored in the config.msgpack mirror if it is usable,
+    else None. The mirror is ignored when msgspec is missing, when it is
+    corrupt or in an older format, and when config.json no longer has the
+    size/mtime recorded in the mirror (e.g. the user edited the JSON by hand
+    or restored it from a backup).
+    """
+    if msgspec is None:
+        return None
+
+    try:
+        mirror = msgspec.msgpack.decode(MSGPACK_PATH.read_bytes(), type=dict)
+        if mirror.get("source") != _config_stamp():
+            return None
+    except (OSError, msgspec.DecodeError):
+        return None
+
+    cfg = mirror.get("config")
+    return cfg if isinstance(cfg, dict) else None
+
+
+def _write_msgpack_mirror(cfg: Dict[str, Any]) -> None:
+    """Write config.msgpack, stamped with the current config.json size/mtime."""
+    try:
+        payload = {"source": _config_stamp(), "config": cfg}
+        _atomic_write_bytes(MSGPACK_PATH, msgspec.msgpack.encode(payload))
+    except OSError as exc:
+        print(f"[config] Failed to write {MSGPACK_PATH.name}: {exc}")
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    """
+    Write data to a temp file next to 'path', then os.replace() it over 'path'.
+    A crash mid-write leaves the previous file intact instead of a truncated one.
+    Each call uses its own temp file, so concurrent writers never share one.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+
+
 def load_raw_config() -> Dict[str, Any]:
     """
     Load config.json and return as plain dict.
@@ -53,20 +227,39 @@ def load_raw_config() -> Dict[str, Any]:
     if not CONFIG_PATH.exists():
         return _default_raw_config()
 
+    mirror = _load_msgpack_mirror()
+    if mirror is not None:
+        return mirror
+
     try:
-        with CONFIG_PATH.open("r", encoding="utf-8") as f:
-            return json.load(f)
-    except JSONDecodeError as e:
+        return _json_loads(CONFIG_PATH.read_bytes())
+    except _JSON_DECODE_ERRORS as e:
         raise ValueError(f"Config file is not valid JSON: {e}") from e
 
 
 def save_raw_config(cfg: Dict[str, Any]) -> None:
     """
     Save the given dict to config.json (pretty-printed JSON).
+    If msgspec is installed, also refresh the config.msgpack mirror.
+
+    Nothing is written when config.json already holds exactly these bytes.
     """
-    CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
-    with CONFIG_PATH.open("w", encoding="utf-8") as f:
-        json.dump(cfg, f, indent=2, sort_keys=False)
+    global _CONFIG_CACHE
+
+    data = _json_dumps(cfg)
+    with _CONFIG_LOCK:
+        _CONFIG_CACHE = None
+        try:
+            unchanged = CONFIG_PATH.read_bytes() == data
+        except OSError:
+            unchanged = False
+        if not unchanged:
+            CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
+            _atomic_write_bytes(CONFIG_PATH, data)
+
+        # Written after config.json so it can record the JSON's final size/mtime.
+        if msgspec is not None and not (unchanged and _load_msgpack_mirror() is not None):
+            _write_msgpack_mirror(cfg)
 
 
 def parse_full_config(raw: Dict[str, Any]) -> FullConfig:
@@ -76,66 +269,51 @@ def parse_full_config(raw: Dict[str, Any]) -> FullConfig:
     version = int(raw.get("version", 1))
     active_profile = raw.get("active_profile", "normal")
 
+    # Hot loops below: bind globals to locals once (cheaper lookups per item)
+    _AppInfo, _AppRule, _ProfileConfig = AppInfo, AppRule, ProfileConfig
+    _norm_a, _norm_d, _tags, _Path = _normalize_action, _normalize_direction, _as_tag_list, Path
+    # The same exe paths key apps and every profile's app_rules: intern them so
+    # all of those dicts share one string object per path (less memory, and
+    # lookups with an interned key compare by identity).
+    _intern = sys.intern
+
     # --- Apps ---
-    apps: Dict[str, AppInfo] = {}
     apps_raw: Dict[str, Any] = raw.get("apps", {}) or {}
-    for exe_path, app_data in apps_raw.items():
-        name = app_data.get("name") or Path(exe_path).name
-        tags = list(app_data.get("tags", []))
-        last_seen = app_data.get("last_seen")
-        pinned = bool(app_data.get("pinned", False))
-
-        apps[exe_path] = AppInfo(
-            exe_path=exe_path,
-            name=name,
-            tags=tags,
-            last_seen=last_seen,
-            pinned=pinned,
+    apps: Dict[str, AppInfo] = {
+        _intern(exe_path): _AppInfo(
+            exe_path=_intern(exe_path),
+            name=app_data.get("name") or _Path(exe_path).name,
+            tags=_tags(app_data.get("tags")),
+            last_seen=app_data.get("last_seen"),
+            pinned=bool(app_data.get("pinned", False)),
         )
+        for exe_path, app_data in apps_raw.items()
+    }
 
     # --- Profiles ---
-    profiles: Dict[str, ProfileConfig] = {}
     profiles_raw: Dict[str, Any] = raw.get("profiles", {}) or {}
 
     if not profiles_raw:
         profiles_raw = _default_raw_config()["profiles"]
 
-    def _normalize_action(value: str) -> Action:
-        return "block" if value == "block" else "allow"
-
-    def _normalize_direction(value: str) -> Direction:
-        value = (value or "out").lower()
-        if value in ("in", "out", "both"):
-            return value  # type: ignore[return-value]
-        return "out"      # type: ignore[return-value]
-
-    for p_name, p_data in profiles_raw.items():
-        display_name = p_data.get("display_name") or p_name.title()
-        description = p_data.get("description", "")
-        default_action = _normalize_action(p_data.get("default_action", "allow"))
-
-        app_rules_raw: Dict[str, Any] = p_data.get("app_rules", {}) or {}
-        app_rules: Dict[str, AppRule] = {}
-
-        for exe_path, rule_data in app_rules_raw.items():
-            action = _normalize_action(rule_data.get("action", "allow"))
-            direction = _normalize_direction(rule_data.get("direction", "out"))
-            temporary_until = rule_data.get("temporary_until")
-
-            app_rules[exe_path] = AppRule(
-                app_exe_path=exe_path,
-                action=action,
-                direction=direction,
-                temporary_until=temporary_until,
-            )
-
-        profiles[p_name] = ProfileConfig(
+    profiles: Dict[str, ProfileConfig] = {
+        p_name: _ProfileConfig(
             name=p_name,
-            display_name=display_name,
-            description=description,
-            default_action=default_action,
-            app_rules=app_rules,
+            display_name=p_data.get("display_name") or p_name.title(),
+            description=p_data.get("description", ""),
+            default_action=_norm_a(p_data.get("default_action", "allow")),
+            app_rules={
+                _intern(exe_path): _AppRule(
+                    app_exe_path=_intern(exe_path),
+                    action=_norm_a(rule_data.get("action", "allow")),
+                    direction=_norm_d(rule_data.get("direction", "out")),
+                    temporary_until_epoch=_temporary_until_epoch(rule_data),
+                )
+                for exe_path, rule_data in (p_data.get("app_rules", {}) or {}).items()
+            },
         )
+        for p_name, p_data in profiles_raw.items()
+    }
 
     # Ensure our 3 base profiles always exist
     defaults = _default_raw_config()["profiles"]
@@ -182,7 +360,7 @@ def full_config_to_raw(cfg: FullConfig) -> Dict[str, Any]:
             app_rules_raw[exe_path] = {
                 "action": rule.action,
                 "direction": rule.direction,
-                "temporary_until": rule.temporary_until,
+                "temporary_until_epoch": rule.temporary_until_epoch,
             }
 
         profiles_raw[p_name] = {
@@ -200,14 +378,39 @@ def full_config_to_raw(cfg: FullConfig) -> Dict[str, Any]:
     }
 
 
+def _cached_load() -> FullConfig:
+    """
+    load_raw_config + parse_full_config, skipped entirely when config.json
+    has the same mtime/size as at the last parse.
+    """
+    global _CONFIG_CACHE
+
+    try:
+        st = CONFIG_PATH.stat()
+    except OSError:
+        # Missing file: defaults, nothing worth caching
+        _CONFIG_CACHE = None
+        return parse_full_config(load_raw_config())
+
+    cached = _CONFIG_CACHE
+    if cached is not None and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+
+    cfg = parse_full_config(load_raw_config())
+    _CONFIG_CACHE = (st.st_mtime_ns, st.st_size, cfg)
+    return cfg
+
+
 def load_config() -> FullConfig:
     """
     Convenience: load_raw_config + parse_full_config.
     On error, reset to default config on disk.
+
+    The parsed FullConfig is cached until config.json changes on disk (or is
+    saved through this module), so repeated calls return the same object.
     """
     try:
-        raw = load_raw_config()
-        return parse_full_config(raw)
+        return _cached_load()
     except Exception as exc:
         print(f"[config] Error loading config; resetting to default: {exc}")
         return ensure_default_config()
@@ -216,9 +419,53 @@ def load_config() -> FullConfig:
 def save_config(cfg: FullConfig) -> None:
     """
     Convenience: full_config_to_raw + save_raw_config.
+
+    'cfg' then becomes the cached config, so the next load_config() returns
+    it without reading config.json back.
     """
+    global _CONFIG_CACHE
+
     raw = full_config_to_raw(cfg)
-    save_raw_config(raw)
+    with _CONFIG_LOCK:
+        save_raw_config(raw)
+
+        try:
+            st = CONFIG_PATH.stat()
+        except OSError:
+            return
+        _CONFIG_CACHE = (st.st_mtime_ns, st.st_size, cfg)
+
+
+@contextlib.contextmanager
+def mutate_config(fresh: bool = False) -> Iterator[FullConfig]:
+    """
+    Load the config once, let the with-block change it, and save it when the
+    block exits normally:
+
+        with mutate_config() as cfg:
+            cfg.active_profile = "focus"
+
+    Nothing is written if the block left the config unchanged (see
+    save_raw_config), and nothing is saved if it raised. The whole block runs
+    under the config lock, so mutations from different threads do not
+    interleave.
+
+    By default the block gets the cached FullConfig, i.e. the object the UI
+    holds. Background threads pass fresh=True to get a private copy parsed
+    from config.json instead; once saved, it becomes the cached config.
+    """
+    global _CONFIG_CACHE
+
+    with _CONFIG_LOCK:
+        cfg = parse_full_config(load_raw_config()) if fresh else load_config()
+        try:
+            yield cfg
+        except BaseException:
+            if not fresh:
+                # cfg is the cached object and may be half-changed: re-read next time
+                _CONFIG_CACHE = None
+            raise
+        save_config(cfg)
 
 
 def ensure_default_config() -> FullConfig:
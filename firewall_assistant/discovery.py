@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
-from pathlib import Path
-from typing import List
+import os
+from typing import Dict, List, Tuple
 
 import datetime as _dt
 
+from .firewall_win import resolve_exe_path
 from .models import AppInfo, FullConfig
 
 try:
@@ -19,91 +20,120 @@ except ImportError:
 
 def _now_iso() -> str:
     """Return current UTC time as ISO string (seconds precision)."""
-    return _dt.datetime.utcnow().isoformat(timespec="seconds")
+    return _dt.datetime.now(_dt.timezone.utc).isoformat(timespec="seconds")
 
 
-def discover_active_apps() -> List[AppInfo]:
+# (pid, create_time) -> (resolved exe_path, name) for processes seen by a
+# previous discovery run. create_time guards against PID reuse; entries for
+# processes that are gone are dropped on each run. exe_path "" = no usable exe.
+_EXE_CACHE: Dict[Tuple[int, float], Tuple[str, str]] = {}
+
+
+def _discover_networked_exes() -> Dict[str, str]:
     """
-    Return a list of AppInfo for apps that currently have network activity
-    (or had very recent activity).
+    Return {resolved exe_path: process name} for processes that currently
+    have at least one inet socket.
 
-    Implementation (Week 1):
-      - Use psutil to get inet connections per process.
-      - For each process with at least one inet connection, create an AppInfo.
+    Implementation:
+      - One psutil.net_connections(kind="inet") call lists every inet socket
+        together with its owning pid.
+      - Only those pids are looked up (exe path + name, cached per process).
       - De-duplicate by exe_path.
     """
-    if psutil is None:
-        return []
-
-    apps_by_exe: dict[str, AppInfo] = {}
-    now = _now_iso()
+    exes: Dict[str, str] = {}
 
     try:
-        # Iterate over all processes, asking only for basic info
-        for proc in psutil.process_iter(["pid", "name", "exe"]):
+        pids = {c.pid for c in psutil.net_connections(kind="inet") if c.pid}
+
+        seen: set[Tuple[int, float]] = set()
+        for pid in pids:
             try:
-                conns = proc.connections(kind="inet")  # may raise AccessDenied/NoSuchProcess
+                proc = psutil.Process(pid)
+                key = (pid, proc.create_time())
+                cached = _EXE_CACHE.get(key)
+                if cached is None:
+                    raw_exe = proc.exe()
+                    if raw_exe:
+                        exe_path = resolve_exe_path(raw_exe)
+                        cached = (exe_path, proc.name() or os.path.basename(exe_path))
+                    else:
+                        # Some system processes might not have a normal exe path
+                        cached = ("", "")
+                    _EXE_CACHE[key] = cached
             except (psutil.AccessDenied, psutil.NoSuchProcess):
                 continue
             except Exception as exc:
-                print(f"[discovery] Error getting connections for pid={proc.pid}: {exc}")
-                continue
-
-            if not conns:
-                # Skip processes that don't use the network at the moment
+                print(f"[discovery] Error inspecting pid={pid}: {exc}")
                 continue
 
-            raw_exe = proc.info.get("exe") or ""
-            if not raw_exe:
-                # Some system processes might not have a normal exe path
-                continue
+            seen.add(key)
+            exe_path, name = cached
+            if exe_path:
+                exes.setdefault(exe_path, name)
 
-            exe_path = str(Path(raw_exe).resolve())
-            name = proc.info.get("name") or Path(exe_path).name
-
-            existing = apps_by_exe.get(exe_path)
-            if existing is None:
-                apps_by_exe[exe_path] = AppInfo(
-                    exe_path=exe_path,
-                    name=name,
-                    tags=[],
-                    last_seen=now,
-                    pinned=False,
-                )
-            else:
-                # If we've already seen this exe, just refresh last_seen
-                existing.last_seen = now
+        # Forget processes that have exited since the last run
+        for key in [k for k in _EXE_CACHE if k not in seen]:
+            del _EXE_CACHE[key]
 
     except Exception as exc:
         print(f"[discovery] Top-level error during discovery: {exc}")
 
-    return list(apps_by_exe.values())
+    return exes
+
+
+def discover_active_apps() -> List[AppInfo]:
+    """
+    Return a list of AppInfo for apps that currently have network activity
+    (or had very recent activity).
+    """
+    if psutil is None:
+        return []
+
+    now = _now_iso()
+    return [
+        AppInfo(exe_path=exe_path, name=name, tags=[], last_seen=now, pinned=False)
+        for exe_path, name in _discover_networked_exes().items()
+    ]
 
 
 def merge_discovered_apps_into_config(cfg: FullConfig) -> None:
     """
-    Take FullConfig, run discover_active_apps(), and:
+    Take FullConfig, discover apps with network activity, and:
       - Add any new exe_path to cfg.apps with basic info.
       - Update last_seen for known apps.
 
+    Known apps (the common case) only get last_seen refreshed; an AppInfo
+    is only built for exe paths not yet in cfg.apps.
+
     Does NOT save to disk; caller must call save_config().
     """
-    discovered = discover_active_apps()
+    if psutil is None:
+        return
+
+    discovered = _discover_networked_exes()
     if not discovered:
         return
 
-    for app in discovered:
-        existing = cfg.apps.get(app.exe_path)
+    known = cfg.apps
+    now = _now_iso()
+    for exe_path, name in discovered.items():
+        existing = known.get(exe_path)
 
-        if existing is None:
-            # New app discovered: add as-is
-            cfg.apps[app.exe_path] = app
-        else:
+        if existing is not None:
             # Known app: update last_seen; keep existing custom name/tags/pinned
-            existing.last_seen = app.last_seen or existing.last_seen
+            existing.last_seen = now
             # If the existing name is empty for some reason, fill it
-            if not existing.name and app.name:
-                existing.name = app.name
+            if not existing.name and name:
+                existing.name = name
+        else:
+            # New app discovered
+            known[exe_path] = AppInfo(
+                exe_path=exe_path,
+                name=name,
+                tags=[],
+                last_seen=now,
+                pinned=False,
+            )
 
 
 if __name__ == "__main__":
@@ -111,4 +141,4 @@ if __name__ == "__main__":
     apps = discover_active_apps()
     print(f"Discovered {len(apps)} active apps:")
     for a in apps:
-        print(f"  {a.name} -> {a.exe_path} (last_seen={a.last_seen})")
\ No newline at end of file
+        print(f"  {a.name} -> {a.exe_path} (last_seen={a.last_seen})")
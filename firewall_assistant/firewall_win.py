@@ -2,135 +2,806 @@
 
 from __future__ import annotations
 
-import argparse
+import contextlib
 import ctypes
+import functools
+import importlib.util
+import locale
+import os
+import re
 import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Literal, Optional
-import datetime as _dt
-
-from .activity_log import log_event
-
-Direction = Literal["in", "out", "both"]
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .activity_log import LazyMessage, is_event_enabled, log_event
+from .models import Direction, FullConfig
+
+# Optional: pywin32 lets us talk to Windows Firewall in-process (COM).
+# It is slow to import, so only look for it here and import it on first
+# firewall access (see _load_pywin32()); explain/list-rules never need it.
+pythoncom: Any = None
+win32com: Any = None
+win32event: Any = None
+try:
+    _HAVE_PYWIN32 = importlib.util.find_spec("win32com") is not None
+except (ImportError, ValueError):
+    _HAVE_PYWIN32 = False
+
+# Talk to Windows Firewall over COM when pywin32 is installed; set to False to
+# force the netsh/PowerShell fallback.
+USE_COM = _HAVE_PYWIN32
+
+# Without COM, apply batched rule changes through one PowerShell
+# (NetSecurity cmdlets) process instead of one 'netsh -f' script.
+USE_POWERSHELL_BATCH = False
 
 # Prefix for all rules created by our tool
 FW_RULE_PREFIX = "FWAssist_"
 
+# Keep netsh/PowerShell from flashing a console window (and spinning up
+# conhost.exe) for every call when we run from the GUI.
+_CREATE_NO_WINDOW = 0x08000000
+if sys.platform == "win32":
+    _startupinfo = subprocess.STARTUPINFO()
+    _startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    _startupinfo.wShowWindow = subprocess.SW_HIDE
+    _NO_WINDOW_KWARGS: Dict[str, Any] = {
+        "creationflags": _CREATE_NO_WINDOW,
+        "startupinfo": _startupinfo,
+    }
+else:
+    _NO_WINDOW_KWARGS = {}
+
+# Encoding subprocess(text=True) would use to decode netsh output
+_TEXT_ENCODING = locale.getpreferredencoding(False)
+
+# netsh's "No rules match the specified criteria." in the Windows display
+# languages we know of. Only ASCII stems are used, so the match works on raw
+# bytes whatever console code page netsh writes in.
+_NO_MATCH_MESSAGES = (
+    b"No rules match",               # English
+    b"Keine Regeln entsprechen",     # German
+    b"ne correspond aux crit",       # French: "Aucune règle ne correspond aux critères..."
+    b"No hay reglas que coincidan",  # Spanish
+    b"Nessuna regola corrisponde",   # Italian
+    b"Nenhuma regra corresponde",    # Portuguese
+)
+_NO_MATCH_RE = re.compile(b"|".join(map(re.escape, _NO_MATCH_MESSAGES)))
+
+# Path component of Microsoft Store/UWP app folders (and their app execution
+# aliases) on any volume or user profile, in os.path.normcase() form
+_STORE_APP_DIR_PART = os.path.normcase(f"{os.sep}WindowsApps{os.sep}")
+
+# Upper bound for concurrent read-only netsh processes (status lookups)
+_MAX_NETSH_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+# A 'Rule Name:   FWAssist_...' line of 'netsh ... show rule' output (raw bytes)
+_RULE_NAME_RE = re.compile(
+    rb"[ \t]*(?i:rule name):[ \t]*(" + re.escape(FW_RULE_PREFIX.encode()) + rb".*?)[ \t]*\r?$"
+)
+
+# 'Rule Name:', 'Direction:' and 'Program:' lines of 'show rule ... verbose'
+_RULE_FIELD_RE = re.compile(rb"[ \t]*(?i:(rule name|direction|program)):[ \t]*(.*?)[ \t]*\r?$")
+
+# Characters PowerShell treats as a single quote inside '...' strings
+_PS_QUOTE_RE = re.compile("(['\u2018\u2019\u201a\u201b])")
+
+# How many trailing output lines a failed streamed netsh call keeps for its error
+_NETSH_ERROR_TAIL_LINES = 20
+
+# Names of the FWAssist_* rules known to exist in Windows Firewall, refreshed by
+# every full enumeration and kept up to date by our own adds/deletes. Lets
+# allow_app skip deletes of rules that are not there. Re-scanned after
+# _LIVE_RULES_TTL seconds in case rules were changed outside this process.
+_LIVE_RULES: Optional[set[str]] = None
+# (name, "in"/"out", normcase(program)) of the same rules - see _rule_key().
+# None when the last enumeration only listed names.
+_LIVE_RULE_KEYS: Optional[set[Tuple[str, str, str]]] = None
+_LIVE_RULES_AT = 0.0
+_LIVE_RULES_TTL = 30.0
+
+# Recent 'show rule' lookups: rule_name -> (time.monotonic(), text or None if
+# the rule does not exist). Entries expire after _SHOW_RULE_TTL seconds and
+# are dropped as soon as we add/delete that rule.
+_SHOW_RULE_CACHE: Dict[str, Tuple[float, Optional[str]]] = {}
+_SHOW_RULE_TTL = 5.0
+_SHOW_RULE_STATS = {"hits": 0, "misses": 0}
+_SHOW_RULE_STATS_LOCK = threading.Lock()   # lookups may run on several threads
+
+# Serializes rule changes (and the live-rules set) between threads. With pywin32
+# a named mutex extends this to every FWAssist process (GUI + CLI).
+_MUTATION_LOCK = threading.RLock()
+_MUTATION_MUTEX_NAME = "Global\\FWAssist_FirewallMutex"
+
+# COM objects belong to the thread (apartment) that created them
+_COM_STATE = threading.local()
+
+# Windows Firewall COM constants (NET_FW_RULE_DIRECTION, NET_FW_ACTION, NET_FW_PROFILE_TYPE2)
+_NET_FW_RULE_DIR_IN = 1
+_NET_FW_RULE_DIR_OUT = 2
+_NET_FW_ACTION_BLOCK = 0
+_NET_FW_PROFILE2_ALL = 0x7FFFFFFF   # Domain, Private, Public
+
+# HRESULT_FROM_WIN32(ERROR_FILE_NOT_FOUND): no rule with that name
+_COM_E_NOT_FOUND = -2147024894
+
 
 # ---------------------------------------------------------------------------
 # Helper functions
 # ---------------------------------------------------------------------------
 
+@functools.lru_cache(maxsize=1)
 def is_admin() -> bool:
-    """Return True if the current process has administrator rights."""
+    """
+    Return True if the current process has administrator rights.
+    A process's elevation cannot change while it runs, so this is checked once.
+    """
     try:
         return bool(ctypes.windll.shell32.IsUserAnAdmin())
     except Exception:
         return False
 
 
-def _run_netsh(args: List[str]) -> subprocess.CompletedProcess:
+class NetshError(RuntimeError):
+    """
+    A netsh command exited with a non-zero code.
+    'output' is its error text as raw bytes; it is only decoded for str().
+    """
+
+    def __init__(self, returncode: int, output: bytes, cmd: List[str]) -> None:
+        super().__init__(returncode, output, cmd)
+        self.returncode = returncode
+        self.output = output
+        self.cmd = cmd
+
+    def __str__(self) -> str:
+        msg = self.output.decode(_TEXT_ENCODING, errors="replace").strip()
+        msg = msg or "Unknown error from netsh"
+        return f"netsh failed (code {self.returncode}): {' '.join(self.cmd)}\n{msg}"
+
+    @property
+    def is_no_such_rule(self) -> bool:
+        """True if netsh failed only because the named rule does not exist."""
+        return _NO_MATCH_RE.search(self.output) is not None
+
+
+def _run_netsh(args: List[str], *, capture: bool = False) -> subprocess.CompletedProcess:
     """
     Run a 'netsh advfirewall firewall' command.
 
-    Raises RuntimeError on non-zero exit code, with stderr/stdout included.
+    capture=True returns stdout/stderr decoded to text for callers that read
+    the output ('show rule'). The default, capture=False, is for add/delete
+    calls that only need the exit status: stdout and stderr share a single pipe and nothing is
+    decoded. (netsh reports errors such as "No rules match ..." on stdout, so
+    it cannot simply go to DEVNULL.)
+
+    Raises NetshError (a RuntimeError) on non-zero exit code, carrying the
+    raw stderr/stdout bytes.
     """
     cmd = ["netsh", "advfirewall", "firewall"] + args
 
     result = subprocess.run(
         cmd,
-        capture_output=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE if capture else subprocess.STDOUT,
+        check=False,
+        **_NO_WINDOW_KWARGS,
+    )
+
+    if result.returncode != 0:
+        output = (result.stderr or b"").strip() or (result.stdout or b"").strip()
+        raise NetshError(result.returncode, output, cmd)
+
+    if capture:
+        # Same decoding text=True would have done, but only on success
+        result.stdout = (result.stdout or b"").decode(_TEXT_ENCODING, errors="replace")
+        result.stderr = (result.stderr or b"").decode(_TEXT_ENCODING, errors="replace")
+
+    return result
+
+
+def _netsh_script_line(args: List[str]) -> str:
+    """
+    Turn netsh arguments into one line of a 'netsh -f' script. Inside a
+    script netsh splits on spaces, so values containing spaces are quoted.
+    """
+    parts = ["advfirewall", "firewall"]
+    for arg in args:
+        key, sep, value = arg.partition("=")
+        if sep and (" " in value or not value):
+            arg = f'{key}="{value}"'
+        parts.append(arg)
+    return " ".join(parts)
+
+
+def _run_netsh_batch(commands: List[List[str]]) -> None:
+    """
+    Run several 'netsh advfirewall firewall' commands (each given as the
+    argument list _run_netsh() takes) in a single netsh process, by writing
+    them to a temporary script and running 'netsh -f <script>'.
+
+    A lone command is run directly. Raises NetshError (carrying netsh's
+    output) if netsh exits with a non-zero code.
+    """
+    if not commands:
+        return
+    if len(commands) == 1:
+        _run_netsh(commands[0])
+        return
+
+    fd, script = tempfile.mkstemp(prefix="fwassist_", suffix=".netsh", text=True)
+    try:
+        with os.fdopen(fd, "w", encoding=_TEXT_ENCODING, errors="replace") as f:
+            f.write("\n".join(_netsh_script_line(args) for args in commands))
+            f.write("\n")
+
+        cmd = ["netsh", "-f", script]
+        result = subprocess.run(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            check=False,
+            **_NO_WINDOW_KWARGS,
+        )
+    finally:
+        os.unlink(script)
+
+    if result.returncode != 0:
+        raise NetshError(result.returncode, (result.stdout or b"").strip(), cmd)
+
+
+def _iter_netsh_lines(args: List[str]) -> Iterator[bytes]:
+    """
+    Run a 'netsh advfirewall firewall' command and yield its output line by
+    line (raw bytes) while it runs, so large outputs are never held in memory
+    as a whole.
+
+    Raises NetshError after the last line if netsh exited with a non-zero code
+    (carrying only the last few lines of output).
+    """
+    cmd = ["netsh", "advfirewall", "firewall"] + args
+    tail: Deque[bytes] = deque(maxlen=_NETSH_ERROR_TAIL_LINES)
+
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        **_NO_WINDOW_KWARGS,
+    ) as proc:
+        for line in proc.stdout:
+            tail.append(line)
+            yield line
+
+    if proc.returncode != 0:
+        raise NetshError(proc.returncode, b"".join(tail).strip(), cmd)
+
+
+def _run_powershell(script: str, *, capture: bool = True) -> subprocess.CompletedProcess:
+    """
+    Run a PowerShell script in a single powershell.exe process.
+
+    capture=False is for scripts whose output is not needed: stdout goes to
+    DEVNULL and only stderr (where PowerShell writes its errors) is piped.
+
+    Raises RuntimeError on non-zero exit code, with stderr/stdout included.
+    """
+    cmd = ["powershell", "-NoProfile", "-NonInteractive", "-Command", script]
+
+    result = subprocess.run(
+        cmd,
+        stdout=subprocess.PIPE if capture else subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
         text=True,
         check=False,
+        **_NO_WINDOW_KWARGS,
     )
 
     if result.returncode != 0:
         stderr = (result.stderr or "").strip()
         stdout = (result.stdout or "").strip()
-        msg = stderr or stdout or "Unknown error from netsh"
-        raise RuntimeError(
-            f"netsh failed (code {result.returncode}): {' '.join(cmd)}\n{msg}"
-        )
+        msg = stderr or stdout or "Unknown error from PowerShell"
+        raise RuntimeError(f"PowerShell failed (code {result.returncode}):\n{msg}")
 
     return result
 
 
-def _rule_names_for_exe(exe_path: str) -> list[str]:
+def _load_pywin32() -> bool:
+    """
+    Import pywin32 on first use; False if it is missing or fails to load
+    (USE_COM is then switched off so the netsh fallback is used).
     """
-    Return the two possible FWAssist rule names for this exe:
+    global pythoncom, win32com, win32event, _HAVE_PYWIN32, USE_COM
+    if win32event is not None:
+        return True
+    if not _HAVE_PYWIN32:
+        return False
+    try:
+        import pythoncom
+        import win32com.client
+        import win32event
+    except ImportError as exc:
+        print(f"[WARNING] pywin32 failed to load ({exc}); falling back to netsh.")
+        _HAVE_PYWIN32 = USE_COM = False
+        pythoncom = win32com = win32event = None
+        return False
+    return True
+
+
+@functools.lru_cache(maxsize=1)
+def _mutation_mutex() -> Any:
+    """Handle of the named mutex shared by all FWAssist processes (pywin32 only)."""
+    return win32event.CreateMutex(None, False, _MUTATION_MUTEX_NAME)
+
+
+@contextlib.contextmanager
+def _firewall_mutation() -> Iterator[None]:
+    """
+    Hold the firewall mutation lock: one thread at a time in this process
+    and, when pywin32 is available, one FWAssist process at a time.
+    Read-only calls (show rule, enumeration) do not need it.
+    """
+    with _MUTATION_LOCK:
+        if not _load_pywin32():
+            yield
+            return
+
+        mutex = _mutation_mutex()
+        win32event.WaitForSingleObject(mutex, win32event.INFINITE)
+        try:
+            yield
+        finally:
+            win32event.ReleaseMutex(mutex)
+
+
+def _ps_quote(value: str) -> str:
+    """
+    Quote value as a PowerShell single-quoted string literal. PowerShell also
+    ends such strings at typographic single quotes, so those are doubled too.
+    """
+    return "'" + _PS_QUOTE_RE.sub(r"\1\1", value) + "'"
+
+
+def _run_ps_batch(
+    deletes: Iterable[str],
+    adds: List[Tuple[str, str, Direction]],
+) -> None:
+    """
+    Delete rules by name and add block rules (rule_name, exe_path, "in"/"out")
+    in a single powershell.exe, using Remove-/New-NetFirewallRule. The rule
+    name is the DisplayName, which is what netsh calls 'name'.
+
+    Missing rules are ignored; a failed add raises RuntimeError.
+    """
+    lines: List[str] = []
+
+    names = [_ps_quote(name) for name in deletes]
+    if names:
+        # -DisplayName takes wildcards; escape them so names match literally
+        lines.append(
+            f"@({', '.join(names)}) | ForEach-Object {{ "
+            "Remove-NetFirewallRule -DisplayName ([WildcardPattern]::Escape($_)) "
+            "-ErrorAction SilentlyContinue }"
+        )
+
+    if adds:
+        specs = ",\n".join(
+            f"  @{{DisplayName={_ps_quote(name)}; Program={_ps_quote(exe_path)}; "
+            f"Direction='{'Inbound' if direction == 'in' else 'Outbound'}'}}"
+            for name, exe_path, direction in adds
+        )
+        lines.append(f"$rules = @(\n{specs}\n)")
+        lines.append(
+            "$rules | ForEach-Object { $r = $_; "
+            "New-NetFirewallRule @r -Action Block -Profile Any -Enabled True "
+            "-ErrorAction Stop | Out-Null }"
+        )
+
+    if lines:
+        _run_powershell("\n".join(lines), capture=False)
+
+
+def _get_fw_policy() -> Any:
+    """
+    Return this thread's HNetCfg.FwPolicy2 COM object (created on first use).
+    Only call when USE_COM is set.
+    """
+    policy = getattr(_COM_STATE, "policy", None)
+    if policy is None:
+        if not _load_pywin32():
+            raise RuntimeError("pywin32 is not available; set USE_COM = False")
+        pythoncom.CoInitialize()
+        policy = win32com.client.Dispatch("HNetCfg.FwPolicy2")
+        _COM_STATE.policy = policy
+    return policy
+
+
+@functools.lru_cache(maxsize=4096)
+def _rule_names_for_exe_name(exe_name: str) -> Tuple[str, str]:
+    """
+    Return the two possible FWAssist rule names for this exe name:
       - FWAssist_BLOCK_OUT_<exe_name>
       - FWAssist_BLOCK_IN_<exe_name>
     """
-    exe_name = Path(exe_path).name or exe_path
-    return [
+    return (
         f"{FW_RULE_PREFIX}BLOCK_OUT_{exe_name}",
         f"{FW_RULE_PREFIX}BLOCK_IN_{exe_name}",
-    ]
+    )
 
 
-def _list_all_fwassist_rule_names() -> list[str]:
+@functools.lru_cache(maxsize=4096)
+def resolve_exe_path(path: str) -> str:
     """
-    Return all FWAssist_* rule names currently present in Windows Firewall.
+    Return the absolute, resolved form of an exe path (the key used in config).
+    Path.resolve() hits the filesystem, so results are cached per input string.
+    The result is interned, like the exe path keys of a loaded config.
+    """
+    return sys.intern(str(Path(path).resolve()))
+
+
+@functools.lru_cache(maxsize=1024)
+def _resolve_exe(path: str) -> Tuple[str, str]:
+    """Return (resolved exe_path, exe file name) for path."""
+    resolved = resolve_exe_path(path)
+    return resolved, os.path.basename(resolved) or resolved
+
+
+def _is_store_app(exe_path: str) -> bool:
+    """True if a resolved exe path is inside a WindowsApps folder."""
+    return _STORE_APP_DIR_PART in os.path.normcase(exe_path)
+
+
+def _block_rule_name(exe_name: str, direction: Direction) -> str:
+    """
+    Name of the FWAssist block rule for an exe name in one direction ("in"/"out").
+    Taken from the cached _rule_names_for_exe_name() pair, so no new string is
+    built per call.
+    """
+    return _rule_names_for_exe_name(exe_name)[direction == "in"]
+
+
+def _rule_key(name: str, direction: str, program: str) -> Tuple[str, str, str]:
+    """
+    Identity of one block rule. Rule names only carry the exe file name, so
+    C:\\A\\app.exe and C:\\B\\app.exe share a name and differ by program.
+    """
+    return name, direction, os.path.normcase(program)
+
+
+def _enumerate_fwassist_rule_names() -> list[str]:
+    """
+    Return the name of every FWAssist_* rule instance in Windows Firewall.
+    A name appears more than once if duplicate rules exist.
 
-    We do:
+    With USE_COM the COM rule collection is enumerated in-process;
+    otherwise we stream
       - netsh advfirewall firewall show rule name=all
-      - parse all 'Rule Name:' lines
-      - keep only those starting with FW_RULE_PREFIX
+    and keep the FW_RULE_PREFIX names from its 'Rule Name:' lines as
+    they arrive.
     """
+    if USE_COM:
+        # Programs come for free over COM
+        return [name for name, _, _ in _enumerate_fwassist_rules()]
+
+    match = _RULE_NAME_RE.match
+    names = []
     try:
-        result = _run_netsh(["show", "rule", "name=all"])
-    except RuntimeError as e:
-        msg = str(e)
-        if "No rules match the specified criteria" in msg:
-            return []
-        raise
-
-    stdout = result.stdout or ""
-    lines = stdout.splitlines()
-
-    names: list[str] = []
-    for line in lines:
-        s = line.strip()
-        if not s:
-            continue
-        if s.lower().startswith("rule name:"):
-            parts = s.split(":", 1)
-            if len(parts) == 2:
-                name = parts[1].strip()
-                if name.startswith(FW_RULE_PREFIX):
-                    names.append(name)
+        for line in _iter_netsh_lines(["show", "rule", "name=all"]):
+            m = match(line)
+            if m is not None:
+                names.append(m.group(1).decode(_TEXT_ENCODING, errors="replace"))
+    except NetshError as e:
+        if not e.is_no_such_rule:
+            raise
 
-    # Deduplicate in case netsh outputs duplicates
-    return sorted(set(names))
+    _set_live_rules(names)
+    return names
 
 
-def _clear_all_fwassist_rules() -> None:
+def _enumerate_fwassist_rules() -> List[Tuple[str, str, str]]:
     """
-    Delete all FWAssist_* rules globally.
+    Like _enumerate_fwassist_rule_names(), but return (name, "in"/"out",
+    program) for every FWAssist_* rule instance, so callers can tell whether
+    a rule still points at the right program.
 
-    This is used when switching profiles so we don't leave stale rules
-    from previous profiles.
+    The netsh fallback has to read 'show rule name=all verbose' (the plain
+    listing has no Program field), so prefer the names-only variant where
+    names are enough.
     """
-    names = _list_all_fwassist_rule_names()
-    if not names:
-        return
-
-    for name in names:
+    if USE_COM:
+        rules = [
+            (
+                r.Name,
+                "in" if r.Direction == _NET_FW_RULE_DIR_IN else "out",
+                r.ApplicationName or "",
+            )
+            for r in _get_fw_policy().Rules
+            if (r.Name or "").startswith(FW_RULE_PREFIX)
+        ]
+    else:
+        match = _RULE_FIELD_RE.match
+        prefix = FW_RULE_PREFIX.encode()
+        found: List[List[str]] = []
+        current: Optional[List[str]] = None
         try:
-            _run_netsh(["delete", "rule", f"name={name}"])
-        except RuntimeError as e:
-            msg = str(e)
-            if "No rules match the specified criteria" in msg:
-                continue
-            else:
+            for line in _iter_netsh_lines(["show", "rule", "name=all", "verbose"]):
+                m = match(line)
+                if m is None:
+                    continue
+                label, value = m.group(1).lower(), m.group(2)
+                if label == b"rule name":
+                    current = None
+                    if value.startswith(prefix):
+                        current = [value.decode(_TEXT_ENCODING, errors="replace"), "", ""]
+                        found.append(current)
+                elif current is not None:
+                    text = value.decode(_TEXT_ENCODING, errors="replace")
+                    if label == b"direction":
+                        current[1] = text.lower()
+                    else:
+                        current[2] = text
+        except NetshError as e:
+            if not e.is_no_such_rule:
                 raise
+        rules = [(name, direction, program) for name, direction, program in found]
 
-    # Log once after clearing
-    log_event(
-        "FWASSIST_RULES_CLEARED",
-        f"Cleared {len(names)} FWAssist_* firewall rules",
-        {"count": len(names), "rule_prefix": FW_RULE_PREFIX},
+    _set_live_rules(
+        [name for name, _, _ in rules],
+        [_rule_key(*rule) for rule in rules],
     )
+    return rules
+
+
+def _set_live_rules(
+    names: List[str],
+    keys: Optional[List[Tuple[str, str, str]]] = None,
+) -> None:
+    """Record a fresh enumeration of the FWAssist_* rule names (and rule keys, if known)."""
+    global _LIVE_RULES, _LIVE_RULE_KEYS, _LIVE_RULES_AT
+    _LIVE_RULES = set(names)
+    _LIVE_RULE_KEYS = None if keys is None else set(keys)
+    _LIVE_RULES_AT = time.monotonic()
+
+
+def _forget_live_rules() -> None:
+    """Drop the known-rules set (e.g. after an unexpected netsh error)."""
+    global _LIVE_RULES, _LIVE_RULE_KEYS
+    _LIVE_RULES = None
+    _LIVE_RULE_KEYS = None
+
+
+def _live_rules() -> set[str]:
+    """
+    Return the set of FWAssist_* rule names believed to exist, enumerating
+    the firewall if it is unknown or older than _LIVE_RULES_TTL.
+    """
+    live = _LIVE_RULES
+    if live is None or time.monotonic() - _LIVE_RULES_AT > _LIVE_RULES_TTL:
+        _enumerate_fwassist_rule_names()
+        live = _LIVE_RULES
+    return live
+
+
+def _live_rule_keys() -> set[Tuple[str, str, str]]:
+    """
+    Like _live_rules(), but the _rule_key() of every live rule. Needs the
+    verbose listing on the netsh path, so only call it when a name is taken.
+    """
+    keys = _LIVE_RULE_KEYS
+    if keys is None or time.monotonic() - _LIVE_RULES_AT > _LIVE_RULES_TTL:
+        _enumerate_fwassist_rules()
+        keys = _LIVE_RULE_KEYS
+    return keys
+
+
+def _com_remove_rule(rules: Any, name: str) -> None:
+    """Remove one rule called 'name' from a COM Rules collection; missing rules are ignored."""
+    try:
+        rules.Remove(name)
+    except pythoncom.com_error as e:
+        if e.hresult != _COM_E_NOT_FOUND:
+            raise
+
+
+def _com_find_rule(name: str) -> Any:
+    """Return the COM rule object called 'name', or None if there is none."""
+    try:
+        return _get_fw_policy().Rules.Item(name)
+    except pythoncom.com_error as e:
+        if e.hresult != _COM_E_NOT_FOUND:
+            raise
+        return None
+
+
+def _describe_com_rule(rule: Any) -> str:
+    """Format a COM rule's main fields like netsh's 'show rule' output."""
+    fields = [
+        ("Rule Name", rule.Name),
+        ("Enabled", "Yes" if rule.Enabled else "No"),
+        ("Direction", "In" if rule.Direction == _NET_FW_RULE_DIR_IN else "Out"),
+        ("Action", "Block" if rule.Action == _NET_FW_ACTION_BLOCK else "Allow"),
+        ("Program", rule.ApplicationName or "Any"),
+    ]
+    return "\n".join(f"{label + ':':<38}{value}" for label, value in fields)
+
+
+def _cached_show_rule(name: str) -> Optional[str]:
+    """
+    Return the description of the rule called 'name' (netsh 'show rule'
+    output, or the COM equivalent), or None if there is no such rule.
+    Results are reused for _SHOW_RULE_TTL seconds.
+    """
+    now = time.monotonic()
+    entry = _SHOW_RULE_CACHE.get(name)
+    hit = entry is not None and now - entry[0] <= _SHOW_RULE_TTL
+    with _SHOW_RULE_STATS_LOCK:
+        _SHOW_RULE_STATS["hits" if hit else "misses"] += 1
+    if hit:
+        return entry[1]
+
+    text: Optional[str]
+    if USE_COM:
+        rule = _com_find_rule(name)
+        text = None if rule is None else _describe_com_rule(rule)
+    else:
+        try:
+            result = _run_netsh(["show", "rule", f"name={name}"], capture=True)
+            text = (result.stdout or "").strip()
+        except NetshError as e:
+            if not e.is_no_such_rule:
+                raise
+            text = None
+
+    _SHOW_RULE_CACHE[name] = (now, text)
+    return text
+
+
+def get_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters and current size of the 'show rule' cache."""
+    return {**_SHOW_RULE_STATS, "entries": len(_SHOW_RULE_CACHE)}
+
+
+def _build_rule_object(exe_path: str, direction: Direction, name: str) -> Any:
+    """
+    Build an HNetCfg.FWRule COM object blocking exe_path in one direction
+    ("in" or "out") on all firewall profiles.
+    """
+    rule = win32com.client.Dispatch("HNetCfg.FWRule")
+    rule.Name = name
+    rule.ApplicationName = exe_path
+    rule.Direction = _NET_FW_RULE_DIR_IN if direction == "in" else _NET_FW_RULE_DIR_OUT
+    rule.Action = _NET_FW_ACTION_BLOCK
+    rule.Enabled = True
+    rule.Profiles = _NET_FW_PROFILE2_ALL
+    return rule
+
+
+# Fixed tail of the 'add rule' arguments for each direction, built once
+_ADD_RULE_TAIL = {
+    d: (f"dir={d}", "action=block", "enable=yes", "profile=any")   # any = Domain, Private, Public
+    for d in ("in", "out")
+}
+
+
+def _netsh_add_args(name: str, exe_path: str, direction: Direction) -> List[str]:
+    """netsh arguments creating a block rule for exe_path in one direction."""
+    # No inner quotes around program: subprocess (or _netsh_script_line) handles spaces
+    return ["add", "rule", f"name={name}", f"program={exe_path}", *_ADD_RULE_TAIL[direction]]
+
+
+def _netsh_change_commands(
+    deletes: Dict[str, int],
+    adds: List[Tuple[str, str, Direction]],
+) -> List[List[str]]:
+    """netsh argument lists for _apply_rule_changes(): deletes first, then adds."""
+    commands = [["delete", "rule", f"name={name}"] for name in deletes]
+    commands.extend(_netsh_add_args(*add) for add in adds)
+    return commands
+
+
+def _invalidate_last_sync() -> None:
+    """
+    Remove the sidecar through which apply_profile() skips unchanged re-syncs
+    (config.LAST_SYNC_PATH): once FWAssist_* rules change outside
+    apply_profile(), its digest no longer describes the firewall.
+    """
+    from .config import LAST_SYNC_PATH
+
+    try:
+        LAST_SYNC_PATH.unlink(missing_ok=True)
+    except OSError as exc:
+        print(f"[WARN] Could not remove {LAST_SYNC_PATH.name}: {exc}")
+
+
+def _apply_rule_changes(
+    deletes: Dict[str, int],
+    adds: List[Tuple[str, str, Direction]],
+) -> List[Tuple[str, str, Direction]]:
+    """
+    Delete rules by name (name -> number of instances) and add block rules
+    given as (rule_name, exe_path, "in"/"out"), keeping the live-rules set
+    up to date. Returns the adds that were made: under the mutation lock,
+    rules another thread or process has created meanwhile are skipped.
+
+    With USE_COM the changes are made in-process over COM. Otherwise they all
+    go into one netsh script (or, with USE_POWERSHELL_BATCH, one PowerShell
+    call), so K changes cost one process instead of K.
+    (netsh deletes every instance of a name at once, so counts only matter
+    for COM.)
+    """
+    if not deletes and not adds:
+        return []
+
+    _invalidate_last_sync()
+    with _firewall_mutation():
+        if adds:
+            # Re-check now that we hold the lock (callers check without it)
+            live = _live_rules()
+            if any(add[0] in live and add[0] not in deletes for add in adds):
+                keys = _live_rule_keys()
+                adds = [
+                    add for add in adds
+                    if add[0] in deletes or _rule_key(add[0], add[2], add[1]) not in keys
+                ]
+
+        if USE_COM:
+            rules = _get_fw_policy().Rules
+            for name, count in deletes.items():
+                for _ in range(count):
+                    _com_remove_rule(rules, name)
+            for name, exe_path, direction in adds:
+                rules.Add(_build_rule_object(exe_path, direction, name))
+        elif USE_POWERSHELL_BATCH:
+            try:
+                _run_ps_batch(deletes, adds)
+            except RuntimeError:
+                _forget_live_rules()
+                raise
+        else:
+            try:
+                _run_netsh_batch(_netsh_change_commands(deletes, adds))
+            except NetshError as e:
+                if not e.is_no_such_rule:
+                    _forget_live_rules()
+                    raise
+                # A rule to delete was already gone and netsh may have stopped
+                # there: re-read the firewall and apply whatever is still missing.
+                rules = _enumerate_fwassist_rules()
+                existing = Counter(name for name, _, _ in rules)
+                existing_keys = {_rule_key(*rule) for rule in rules}
+                try:
+                    _run_netsh_batch(_netsh_change_commands(
+                        {name: n for name, n in deletes.items() if name in existing},
+                        [
+                            add for add in adds
+                            if _rule_key(add[0], add[2], add[1]) not in existing_keys
+                        ],
+                    ))
+                except NetshError as e:
+                    _forget_live_rules()
+                    if not e.is_no_such_rule:
+                        raise
+
+        live = _LIVE_RULES
+        if live is not None:
+            live.difference_update(deletes)
+            live.update(name for name, _, _ in adds)
+        keys = _LIVE_RULE_KEYS
+        if keys is not None:
+            if deletes:
+                keys.difference_update([key for key in keys if key[0] in deletes])
+            keys.update(_rule_key(name, d, exe_path) for name, exe_path, d in adds)
+        for name in deletes:
+            _SHOW_RULE_CACHE.pop(name, None)
+        for name, _, _ in adds:
+            _SHOW_RULE_CACHE.pop(name, None)
+
+    return adds
 
 
 # ---------------------------------------------------------------------------
@@ -142,48 +813,69 @@ def block_app(path: str, direction: Direction = "out") -> None:
     Block an application's network access in the given direction using
     Windows Firewall via netsh.
     """
-    exe_path = str(Path(path).resolve())
+    block_apps_bulk([(path, direction)])
 
-    if "WindowsApps" in exe_path:
-        print("[WARNING] This looks like a Microsoft Store/UWP app under WindowsApps.")
-        print("         Current tool is focused on classic desktop .exe apps.")
-        print("         Please test with something like C:\\Windows\\System32\\notepad.exe.")
-        log_event(
-            "APP_BLOCK_SKIPPED_WINDOWSAPPS",
-            f"Skipped blocking UWP/Store app at {exe_path}",
-            {"exe_path": exe_path},
-        )
-        return
 
-    if direction == "both":
-        block_app(exe_path, "in")
-        block_app(exe_path, "out")
-        return
+def block_apps_bulk(specs: Iterable[Tuple[str, Direction]]) -> None:
+    """
+    Block several applications at once. 'specs' holds (exe path, direction)
+    pairs; all of their rules are created with a single netsh process
+    (or in-process via COM).
+
+    Windows Firewall accepts several rules with the same name, so rules that
+    already exist (same name, direction and program) are skipped instead of
+    being added again. Apps whose exe names match share a rule name and each
+    get their own rule.
+    """
+    live = _live_rules()
+    live_keys: Optional[set[Tuple[str, str, str]]] = None
+    adds: List[Tuple[str, str, Direction]] = []
+    seen: set[Tuple[str, str, str]] = set()
+
+    for path, direction in specs:
+        exe_path, exe_name = _resolve_exe(path)
+
+        if _is_store_app(exe_path):
+            print("[WARNING] This looks like a Microsoft Store/UWP app under WindowsApps.")
+            print("         Current tool is focused on classic desktop .exe apps.")
+            print("         Please test with something like C:\\Windows\\System32\\notepad.exe.")
+            log_event(
+                "APP_BLOCK_SKIPPED_WINDOWSAPPS",
+                LazyMessage("Skipped blocking UWP/Store app at %s", exe_path),
+                {"exe_path": exe_path},
+            )
+            continue
 
-    exe_name = Path(exe_path).name or exe_path
-    rule_name = f"{FW_RULE_PREFIX}BLOCK_{direction.upper()}_{exe_name}"
+        for d in (("in", "out") if direction == "both" else (direction,)):
+            rule_name = _block_rule_name(exe_name, d)
+            key = _rule_key(rule_name, d, exe_path)
+            if rule_name in live and live_keys is None:
+                # The name is taken: find out which programs it blocks
+                live_keys = _live_rule_keys()
+            if key in seen or (live_keys is not None and key in live_keys):
+                print(f"[INFO] Rule '{rule_name}' already exists for this app; nothing to add.")
+                continue
+            print(f"[INFO] Blocking app '{exe_path}' (direction={d}) with rule '{rule_name}'")
+            seen.add(key)
+            adds.append((rule_name, exe_path, d))
 
-    print(f"[INFO] Blocking app '{exe_path}' (direction={direction}) with rule '{rule_name}'")
+    if not adds:
+        return
 
-    args = [
-        "add",
-        "rule",
-        f"name={rule_name}",
-        f"dir={direction}",
-        "action=block",
-        f"program={exe_path}",   # no inner quotes; subprocess handles spaces
-        "enable=yes",
-        "profile=any",           # Domain, Private, Public
-    ]
-    _run_netsh(args)
-    print("[OK] Rule created.")
+    adds = _apply_rule_changes({}, adds)
+    if not adds:
+        return
+    print("[OK] Rule created." if len(adds) == 1 else f"[OK] {len(adds)} rules created.")
 
-    # Log the change
-    log_event(
-        "APP_BLOCK_RULE_CREATED",
-        f"Blocked {exe_path} ({direction})",
-        {"exe_path": exe_path, "direction": direction, "rule_name": rule_name},
-    )
+    # Log the changes
+    if not is_event_enabled("APP_BLOCK_RULE_CREATED"):
+        return
+    for rule_name, exe_path, d in adds:
+        log_event(
+            "APP_BLOCK_RULE_CREATED",
+            LazyMessage("Blocked %s (%s)", exe_path, d),
+            {"exe_path": exe_path, "direction": d, "rule_name": rule_name},
+        )
 
 
 def allow_app(path: str) -> None:
@@ -191,42 +883,74 @@ def allow_app(path: str) -> None:
     Allow an application's network access again by removing all FWAssist rules
     associated with that executable (by name pattern).
     """
-    exe_path = str(Path(path).resolve())
-    print(f"[INFO] Allowing app '{exe_path}' (removing FWAssist_* rules)")
+    allow_apps_bulk([path])
 
-    rule_names = _rule_names_for_exe(exe_path)
 
-    removed_any = False
-    actually_removed: list[str] = []
-    for name in rule_names:
-        try:
-            _run_netsh(["delete", "rule", f"name={name}"])
-            print(f"[OK] Deleted rule '{name}' (if it existed).")
-            removed_any = True
-            actually_removed.append(name)
-        except RuntimeError as e:
-            msg = str(e)
-            if "No rules match the specified criteria" in msg:
-                # Rule not present; ignore
-                continue
-            else:
-                raise
-
-    if not removed_any:
-        print("[INFO] No FWAssist_* rules existed for this app. Nothing to remove.")
-        log_event(
-            "APP_ALLOW_NO_RULES",
-            f"No FWAssist_* rules found to remove for {exe_path}",
-            {"exe_path": exe_path},
+def allow_apps_bulk(paths: Iterable[str]) -> None:
+    """
+    Allow several applications at once, removing all of their FWAssist rules
+    with one listing and one delete batch of netsh (or in-process via COM).
+    """
+    per_app: List[Tuple[str, List[str]]] = []
+    for path in paths:
+        exe_path, exe_name = _resolve_exe(path)
+        print(f"[INFO] Allowing app '{exe_path}' (removing FWAssist_* rules)")
+        per_app.append((exe_path, _rule_names_for_exe_name(exe_name)))
+
+    with _firewall_mutation():
+        # Re-read the firewall under the lock rather than trusting the cached
+        # set: it may miss rules another process or thread added meanwhile,
+        # and skipping their delete would leave the app blocked.
+        existing = Counter(_enumerate_fwassist_rule_names())
+        per_app = [(exe_path, [n for n in names if n in existing]) for exe_path, names in per_app]
+        _apply_rule_changes(
+            {name: existing[name] for _, names in per_app for name in names}, []
         )
-    else:
+
+    for exe_path, names in per_app:
+        if not names:
+            print(f"[INFO] No FWAssist_* rules existed for '{exe_path}'. Nothing to remove.")
+            log_event(
+                "APP_ALLOW_NO_RULES",
+                LazyMessage("No FWAssist_* rules found to remove for %s", exe_path),
+                {"exe_path": exe_path},
+            )
+            continue
+
+        for name in names:
+            print(f"[OK] Deleted rule '{name}'.")
         log_event(
             "APP_RULES_REMOVED",
-            f"Removed FWAssist rules for {exe_path}",
-            {"exe_path": exe_path, "rules": actually_removed},
+            LazyMessage("Removed FWAssist rules for %s", exe_path),
+            {"exe_path": exe_path, "rules": names},
         )
 
 
+def status_apps(paths: Iterable[str]) -> Dict[str, List[str]]:
+    """
+    Return {resolved exe_path: descriptions of its FWAssist rules} for each
+    path (an empty list if it has none).
+
+    'show rule' lookups are read-only and take no lock, so on the netsh path
+    they run concurrently (one netsh process each); COM lookups are
+    in-process and simply run in order.
+    """
+    apps = [_resolve_exe(path) for path in paths]
+    names = [name for _, exe_name in apps for name in _rule_names_for_exe_name(exe_name)]
+
+    if USE_COM or len(names) < 2:
+        texts = [_cached_show_rule(name) for name in names]
+    else:
+        with ThreadPoolExecutor(max_workers=min(_MAX_NETSH_WORKERS, len(names))) as ex:
+            texts = list(ex.map(_cached_show_rule, names))
+
+    # Two rule names (OUT, IN) per app, in order
+    return {
+        exe_path: [text for text in texts[2 * i:2 * i + 2] if text]
+        for i, (exe_path, _) in enumerate(apps)
+    }
+
+
 def status_app(path: str) -> None:
     """
     Show FWAssist-related firewall rules that affect this executable.
@@ -235,33 +959,19 @@ def status_app(path: str) -> None:
       FWAssist_BLOCK_OUT_<exe_name>
       FWAssist_BLOCK_IN_<exe_name>
     """
-    exe_path = str(Path(path).resolve())
+    exe_path, _ = _resolve_exe(path)
     print(f"[INFO] Checking FWAssist rules for '{exe_path}'")
 
-    rule_names = _rule_names_for_exe(exe_path)
-    found_any = False
+    found = status_apps([exe_path])[exe_path]
 
-    for name in rule_names:
-        try:
-            result = _run_netsh(["show", "rule", f"name={name}"])
-        except RuntimeError as e:
-            msg = str(e)
-            if "No rules match the specified criteria" in msg:
-                # Rule not present
-                continue
-            else:
-                raise
-
-        stdout = (result.stdout or "").strip()
-        if stdout:
-            if not found_any:
-                print("----- FWAssist rules for this app -----")
-                found_any = True
-            print(stdout)
-            print("----------------------------------------")
-
-    if not found_any:
+    if not found:
         print("[INFO] No FWAssist_* rules found for this app.")
+        return
+
+    print("----- FWAssist rules for this app -----")
+    for text in found:
+        print(text)
+        print("----------------------------------------")
 
 
 # ---------------------------------------------------------------------------
@@ -271,29 +981,41 @@ def status_app(path: str) -> None:
 def sync_profile_to_windows_firewall(
     profile_name: str,
     cfg_path: Optional[str] = None,  # cfg_path unused; config module has global path
+    cfg: Optional[FullConfig] = None,
 ) -> None:
     """
     Enforce the given profile in Windows Firewall.
 
+    Callers that already hold the current FullConfig can pass it as 'cfg' so
+    it is not read from disk again; expired temporary allows are then
+    cleared on that same object.
+
     Steps:
-      1) Load config.json
-      2) Clear all existing FWAssist_* rules
-      3) For the selected profile:
+      1) Load config.json (unless 'cfg' was given)
+      2) For the selected profile, work out the desired FWAssist_* block rules:
            - For each app rule:
-               * if action == "block": create a block rule (respecting direction),
+               * if action == "block": a block rule (respecting direction),
                  UNLESS there is an active temporary_until, in which case allow.
-               * if action == "allow": remove any FWAssist_* rules for that app
-      4) If any temporary_until timestamps have expired or are invalid,
-         clear them in config.
+               * if action == "allow": no FWAssist_* rules for that app
+      3) Diff against the FWAssist_* rules currently in Windows Firewall:
+         delete rules that are not desired, add desired rules that are missing,
+         and replace duplicated rules or rules pointing at another program or
+         direction. Rules that are already correct are left untouched.
+      4) If any temporary allows have expired, clear them in config
+         (malformed values are already dropped when the config is parsed).
     """
-    from .config import load_config, save_config
+    from .config import load_config, mutate_config
 
-    cfg = load_config()
+    if cfg is None:
+        cfg = load_config()
 
-    if profile_name not in cfg.profiles:
+    profile = cfg.profiles.get(profile_name)
+    if profile is None:
         raise ValueError(f"Profile '{profile_name}' not found in config")
 
-    profile = cfg.profiles[profile_name]
+    # Whatever this sync does, an earlier apply_profile() digest is now stale
+    # (apply_profile() records a fresh one once the sync is done).
+    _invalidate_last_sync()
 
     print(f"[INFO] Syncing profile '{profile_name}' to Windows Firewall...")
     log_event(
@@ -302,76 +1024,131 @@ def sync_profile_to_windows_firewall(
         {"profile": profile_name},
     )
 
-    # 1) Clear all rules our tool has created before
-    _clear_all_fwassist_rules()
-
-    # 2) Apply rules for this profile
-    now = _dt.datetime.utcnow()
-    cfg_modified = False
+    # 1) Work out which block rules this profile wants
+    now = time.time()
+    # Apps whose temporary allow expired (cleared in cfg, persisted at the end)
+    expired: List[str] = []
+    # One entry per app: skip building them when the event is disabled
+    log_applied = is_event_enabled("PROFILE_RULE_APPLIED")
+    # _rule_key() -> (exe_path, "in"/"out"). Keyed by program as well as name:
+    # apps with the same exe name in different folders share a rule name.
+    desired: Dict[Tuple[str, str, str], Tuple[str, Direction]] = {}
 
     for exe_path, rule in profile.app_rules.items():
-        exe_path_resolved = str(Path(exe_path).resolve())
+        exe_path_resolved, exe_name = _resolve_exe(exe_path)
         dir_value: Direction = rule.direction  # config parsing normalizes this
 
         # Determine effective action, considering temporary_until on block rules
         effective_action = rule.action
         temp_active = False
 
-        if rule.temporary_until and rule.action == "block":
-            try:
-                expiry = _dt.datetime.fromisoformat(rule.temporary_until)
-                if now < expiry:
-                    # Temporarily allow: skip creating block rule
-                    effective_action = "allow"
-                    temp_active = True
-                else:
-                    # Temporary has expired; clear it
-                    rule.temporary_until = None
-                    cfg_modified = True
-            except ValueError:
-                # Invalid timestamp; clear it to avoid confusion
-                rule.temporary_until = None
-                cfg_modified = True
+        expiry = rule.temporary_until_epoch
+        if expiry is not None and rule.action == "block":
+            if now < expiry:
+                # Temporarily allow: skip creating block rule
+                effective_action = "allow"
+                temp_active = True
+            else:
+                # Temporary has expired; clear it
+                rule.temporary_until_epoch = None
+                expired.append(exe_path)
 
         if effective_action == "block":
-            block_app(exe_path_resolved, direction=dir_value)
-            log_event(
-                "PROFILE_RULE_APPLIED",
-                f"Profile '{profile_name}' blocking {exe_path_resolved} ({dir_value})",
-                {
-                    "profile": profile_name,
-                    "exe_path": exe_path_resolved,
-                    "action": "block",
-                    "direction": dir_value,
-                    "temporary_until": rule.temporary_until,
-                },
-            )
+            for d in (("in", "out") if dir_value == "both" else (dir_value,)):
+                desired[_rule_key(_block_rule_name(exe_name, d), d, exe_path_resolved)] = (
+                    exe_path_resolved, d
+                )
+            if log_applied:
+                log_event(
+                    "PROFILE_RULE_APPLIED",
+                    LazyMessage(
+                        "Profile '%s' blocking %s (%s)",
+                        profile_name, exe_path_resolved, dir_value,
+                    ),
+                    {
+                        "profile": profile_name,
+                        "exe_path": exe_path_resolved,
+                        "action": "block",
+                        "direction": dir_value,
+                        "temporary_until": rule.temporary_until,
+                    },
+                )
         elif effective_action == "allow":
-            # This is either an explicit allow rule, or a temporary allow
-            allow_app(exe_path_resolved)
-            event_type = "PROFILE_RULE_APPLIED"
-            message = f"Profile '{profile_name}' allowing {exe_path_resolved}"
-            extra: dict = {
+            # This is either an explicit allow rule, or a temporary allow.
+            # Any FWAssist_* rule left for it is removed by the diff below.
+            if temp_active:
+                event_type = "PROFILE_RULE_TEMP_ALLOW_IN_EFFECT"
+                message = LazyMessage(
+                    "Profile '%s' TEMPORARILY ALLOWING %s until %s",
+                    profile_name, exe_path_resolved, rule.temporary_until,
+                )
+            else:
+                if not log_applied:
+                    continue
+                event_type = "PROFILE_RULE_APPLIED"
+                message = LazyMessage(
+                    "Profile '%s' allowing %s", profile_name, exe_path_resolved
+                )
+            log_event(event_type, message, {
                 "profile": profile_name,
                 "exe_path": exe_path_resolved,
                 "action": "allow",
                 "base_action": rule.action,
                 "temporary_until": rule.temporary_until,
-            }
-            if temp_active:
-                event_type = "PROFILE_RULE_TEMP_ALLOW_IN_EFFECT"
-                message = (
-                    f"Profile '{profile_name}' TEMPORARILY ALLOWING "
-                    f"{exe_path_resolved} until {rule.temporary_until}"
-                )
-            log_event(event_type, message, extra)
+            })
         else:
             # Should not happen (Action is Literal["allow","block"])
             continue
 
-    # Save config if we modified any temporary_until (expired / invalid)
-    if cfg_modified:
-        save_config(cfg)
+    # 2) Apply only the difference against what is already in the firewall
+    #    (under the mutation lock, so the diff cannot go stale half-way)
+    with _firewall_mutation():
+        rules = _enumerate_fwassist_rules()
+        existing = Counter(name for name, _, _ in rules)
+
+        # Rules are deleted by name (every instance at once), so the unit of
+        # correctness is a name: it is left alone only if its instances are
+        # exactly the desired rules for that name (one each, right direction
+        # and program, e.g. both C:\\A\\app.exe and C:\\B\\app.exe). Every
+        # other FWAssist_* name is deleted and its desired rules added back.
+        wanted_by_name: Dict[str, set[Tuple[str, str, str]]] = {}
+        for key in desired:
+            wanted_by_name.setdefault(key[0], set()).add(key)
+        found_by_name: Dict[str, List[Tuple[str, str, str]]] = {}
+        for rule in rules:
+            found_by_name.setdefault(rule[0], []).append(_rule_key(*rule))
+        correct = {
+            name for name, found in found_by_name.items()
+            if len(found) == len(wanted_by_name.get(name, ()))
+            and set(found) == wanted_by_name[name]
+        }
+        stale = [name for name in existing if name not in wanted_by_name]
+        _apply_rule_changes({name: n for name, n in existing.items() if name not in correct}, [])
+        block_apps_bulk(
+            (exe_path_resolved, d)
+            for (name, _, _), (exe_path_resolved, d) in desired.items()
+            if name not in correct
+        )
+
+    if stale:
+        log_event(
+            "FWASSIST_RULES_CLEARED",
+            f"Removed {len(stale)} stale FWAssist_* firewall rules",
+            {"count": len(stale), "rules": stale, "profile": profile_name},
+        )
+
+    # Persist cleared temporary allows. cfg may be a snapshot, so merge into
+    # the config on disk instead of saving cfg over newer changes; a rule
+    # that got a new temporary allow since then keeps it. fresh=True: this
+    # may run on the sync worker, so never touch the UI's cached object.
+    if expired:
+        with mutate_config(fresh=True) as live_cfg:
+            live_profile = live_cfg.profiles.get(profile_name)
+            for exe_path in expired:
+                rule = live_profile.app_rules.get(exe_path) if live_profile else None
+                until = rule.temporary_until_epoch if rule is not None else None
+                if until is not None and until <= now:
+                    rule.temporary_until_epoch = None
 
     print(f"[INFO] Profile '{profile_name}' sync complete.")
     log_event(
@@ -386,6 +1163,8 @@ def sync_profile_to_windows_firewall(
 # ---------------------------------------------------------------------------
 
 def _cli() -> None:
+    import argparse
+
     parser = argparse.ArgumentParser(
         description=(
             "Windows Firewall control per application (FWAssist).\n"
@@ -2,14 +2,21 @@
 
 from __future__ import annotations
 
+import datetime as _dt
+import os
 from dataclasses import dataclass, field
 from typing import Dict, List, Literal, Optional
 
+__all__ = ["Action", "Direction", "AppInfo", "AppRule", "ProfileConfig", "FullConfig"]
+
+# True on Windows, where os.path.normcase() folds case (see ProfileConfig.find_rule)
+_CASE_INSENSITIVE_PATHS = os.path.normcase("A") == "a"
+
 Action = Literal["allow", "block"]
 Direction = Literal["in", "out", "both"]
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class AppInfo:
     """
     Basic information about an application executable, stored in config.
@@ -22,7 +29,7 @@ class AppInfo:
     pinned: bool = False
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class AppRule:
     """
     Per-profile rule for a specific app (by exe_path).
@@ -30,10 +37,56 @@ class AppRule:
     app_exe_path: str
     action: Action          # "allow" or "block"
     direction: Direction = "out"
-    temporary_until: Optional[str] = None  # ISO timestamp or None (for future use)
+    # Unix time (UTC seconds) a temporary allow of a BLOCK rule ends, or None
+    temporary_until_epoch: Optional[int] = None
+
+    @property
+    def temporary_until(self) -> Optional[str]:
+        """temporary_until_epoch as an ISO timestamp (UTC), for display and logs."""
+        epoch = self.temporary_until_epoch
+        if epoch is None:
+            return None
+        return _dt.datetime.fromtimestamp(epoch, _dt.timezone.utc).isoformat(timespec="seconds")
+
+    def set_temporary_until(self, until: Optional[_dt.datetime]) -> None:
+        """Set temporary_until_epoch from an aware datetime (None clears it)."""
+        self.temporary_until_epoch = None if until is None else int(until.timestamp())
+
+
+def _drops_index(method):
+    """Wrap a dict mutator so it also discards _RuleMap's cached key index."""
+    def wrapper(self, *args, **kwargs):
+        self._normalized = None
+        return method(self, *args, **kwargs)
+    wrapper.__name__ = method.__name__
+    return wrapper
+
+
+class _RuleMap(dict):
+    """
+    The dict behind ProfileConfig.app_rules (exe_path -> AppRule). It caches
+    the case-folded key index find_rule() uses on Windows and drops it on
+    every mutation, however the dict is changed.
+    """
+    _normalized: Optional[Dict[str, str]] = None  # os.path.normcase(key) -> key
+
+    def normalized(self) -> Dict[str, str]:
+        index = self._normalized
+        if index is None:
+            index = self._normalized = {os.path.normcase(k): k for k in self}
+        return index
+
+    __setitem__ = _drops_index(dict.__setitem__)
+    __delitem__ = _drops_index(dict.__delitem__)
+    __ior__ = _drops_index(dict.__ior__)
+    clear = _drops_index(dict.clear)
+    pop = _drops_index(dict.pop)
+    popitem = _drops_index(dict.popitem)
+    setdefault = _drops_index(dict.setdefault)
+    update = _drops_index(dict.update)
 
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class ProfileConfig:
     """
     A logical profile (Normal, Public Wi-Fi, Focus, etc.).
@@ -44,8 +97,39 @@ class ProfileConfig:
     default_action: Action           # conceptual default for unknown apps
     app_rules: Dict[str, AppRule] = field(default_factory=dict)  # key: exe_path
 
+    def __post_init__(self) -> None:
+        if not isinstance(self.app_rules, _RuleMap):
+            self.app_rules = _RuleMap(self.app_rules)
+
+    def find_rule(self, exe_path: str) -> Optional[AppRule]:
+        """
+        Return the rule for exe_path, or None.
+        On Windows paths are matched case-insensitively (like the filesystem),
+        so a rule stored as C:\\Foo\\app.exe is found for c:\\foo\\APP.EXE.
+        """
+        rules = self.app_rules
+        rule = rules.get(exe_path)
+        if rule is not None:
+            return rule
+
+        if not _CASE_INSENSITIVE_PATHS:
+            return None
+
+        if isinstance(rules, _RuleMap):
+            normalized = rules.normalized()
+        else:
+            # app_rules was replaced by a plain dict after construction
+            normalized = {os.path.normcase(k): k for k in rules}
+
+        stored_key = normalized.get(os.path.normcase(exe_path))
+        return rules.get(stored_key) if stored_key is not None else None
+
+    def set_rule(self, exe_path: str, rule: AppRule) -> None:
+        """Add or replace the rule for exe_path."""
+        self.app_rules[exe_path] = rule
+
 
-@dataclass
+@dataclass(slots=True, kw_only=True)
 class FullConfig:
     """
     Top-level configuration object representing config.json.
@@ -2,34 +2,82 @@
 
 from __future__ import annotations
 
-from pathlib import Path
-from typing import Any, Dict
+import copy
+import functools
+import hashlib
+import os
+import sys
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, NamedTuple, Optional
 import datetime as _dt
 
-from .models import FullConfig, ProfileConfig, Action, AppRule
-from .config import load_config, save_config
-from .firewall_win import sync_profile_to_windows_firewall
-from .activity_log import log_event
+from .models import FullConfig, ProfileConfig, Action, AppRule, Direction
+from .config import LAST_SYNC_PATH, load_config, mutate_config, save_config
+from .firewall_win import resolve_exe_path, sync_profile_to_windows_firewall
+from .activity_log import LazyMessage, is_event_enabled, log_event
+
+if TYPE_CHECKING:
+    import argparse
+
+__all__ = [
+    "Explanation",
+    "get_active_profile_ro",
+    "get_active_profile",
+    "set_active_profile",
+    "apply_profile",
+    "set_app_action_in_profile",
+    "set_temporary_allow_in_active_profile",
+    "set_temporary_allow_many_in_active_profile",
+    "explain_app_in_active_profile",
+    "explain_apps",
+]
+
+# Log an APP_STATUS_EXPLAINED event for every explain_app_in_active_profile()
+# call. It is a pure read, so callers that poll it may want this off.
+LOG_EXPLANATIONS = True
+
+# Firewall syncs run here, one at a time and in submission order, so a
+# background sync (temporary allow) cannot land after a later apply_profile().
+_SYNC_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fwassist-sync")
+
+
+def get_active_profile_ro(cfg: FullConfig) -> ProfileConfig:
+    """
+    Return the currently active ProfileConfig without changing cfg.
+    If cfg.active_profile is invalid, return the profile get_active_profile()
+    would repair it to ("normal", else the first one), but do not save.
+    """
+    profile = cfg.profiles.get(cfg.active_profile)
+    if profile is not None:
+        return profile
+
+    if "normal" in cfg.profiles:
+        return cfg.profiles["normal"]
+    if cfg.profiles:
+        return next(iter(cfg.profiles.values()))
+    raise RuntimeError("No profiles available in config")
 
 
 def get_active_profile(cfg: FullConfig) -> ProfileConfig:
     """
     Return the currently active ProfileConfig from FullConfig.
-    If cfg.active_profile is invalid, try to repair it.
+    If cfg.active_profile is invalid, try to repair it (and save the config).
+    Read-only callers should use get_active_profile_ro().
     """
-    if cfg.active_profile in cfg.profiles:
-        return cfg.profiles[cfg.active_profile]
+    profile = get_active_profile_ro(cfg)
+    if cfg.active_profile != profile.name:
+        cfg.active_profile = profile.name
+        save_config(cfg)
+    return profile
 
-    # Attempt to repair
-    if "normal" in cfg.profiles:
-        cfg.active_profile = "normal"
-    elif cfg.profiles:
-        cfg.active_profile = next(iter(cfg.profiles))
-    else:
-        raise RuntimeError("No profiles available in config")
 
-    save_config(cfg)
-    return cfg.profiles[cfg.active_profile]
+def _require_profile(cfg: FullConfig, profile_name: str) -> ProfileConfig:
+    """Return cfg.profiles[profile_name]; ValueError if there is no such profile."""
+    profile = cfg.profiles.get(profile_name)
+    if profile is None:
+        raise ValueError(f"Profile '{profile_name}' not found")
+    return profile
 
 
 def set_active_profile(cfg: FullConfig, profile_name: str) -> None:
@@ -37,8 +85,7 @@ def set_active_profile(cfg: FullConfig, profile_name: str) -> None:
     Set cfg.active_profile to profile_name and persist config.
     Does NOT itself call Windows Firewall; caller can decide when to sync.
     """
-    if profile_name not in cfg.profiles:
-        raise ValueError(f"Profile '{profile_name}' not found")
+    _require_profile(cfg, profile_name)
 
     cfg.active_profile = profile_name
     save_config(cfg)
@@ -49,20 +96,87 @@ def set_active_profile(cfg: FullConfig, profile_name: str) -> None:
     )
 
 
-def apply_profile(profile_name: str) -> None:
+def _submit_sync(
+    profile_name: str, cfg: FullConfig, record_digest: bool = False
+) -> "Future[None]":
+    """
+    Queue sync_profile_to_windows_firewall(profile_name) on _SYNC_EXECUTOR.
+    The worker gets its own copy of cfg: cfg is usually the cached config the
+    UI thread keeps reading and changing while the sync runs.
+
+    With record_digest, the synced profile's digest is written to
+    LAST_SYNC_PATH within the same job, so a sync queued behind it cannot
+    run in between and leave a digest the firewall no longer matches.
+    """
+    return _SYNC_EXECUTOR.submit(_sync_job, profile_name, copy.deepcopy(cfg), record_digest)
+
+
+def _sync_job(profile_name: str, cfg: FullConfig, record_digest: bool) -> None:
+    sync_profile_to_windows_firewall(profile_name, cfg=cfg)
+    if record_digest:
+        # The sync may have cleared expired temporary allows; digest what it used.
+        profile = cfg.profiles[profile_name]
+        _write_last_sync(f"{profile_name}\n{_profile_sync_digest(profile)}")
+
+
+def _report_sync_error(future: "Future[None]") -> None:
+    exc = future.exception()
+    if exc is not None:
+        print(f"[profiles] Background firewall sync failed: {exc}")
+
+
+def _profile_sync_digest(profile: ProfileConfig) -> str:
+    """
+    Stable digest of everything sync_profile_to_windows_firewall() derives
+    its rules from: each app rule's action and direction, and whether its
+    temporary allow is still in effect (so an expiry changes the digest).
+
+    Uses hashlib rather than hash(), which is salted per process.
+    """
+    now = time.time()
+    h = hashlib.blake2b(profile.name.encode("utf-8"), digest_size=16)
+    for exe_path in sorted(profile.app_rules):
+        rule = profile.app_rules[exe_path]
+        until = rule.temporary_until_epoch
+        temp_active = until is not None and now < until
+        h.update(
+            f"\0{exe_path}\0{rule.action}\0{rule.direction}\0{int(temp_active)}"
+            .encode("utf-8")
+        )
+    return h.hexdigest()
+
+
+def _read_last_sync() -> str:
+    try:
+        return LAST_SYNC_PATH.read_text(encoding="utf-8")
+    except OSError:
+        return ""
+
+
+def _write_last_sync(value: str) -> None:
+    try:
+        LAST_SYNC_PATH.write_text(value, encoding="utf-8")
+    except OSError as exc:
+        print(f"[profiles] Could not record last sync: {exc}")
+
+
+def apply_profile(profile_name: str, force: bool = False) -> FullConfig:
     """
     High-level: load config, set active_profile, save config,
     and call sync_profile_to_windows_firewall(profile_name).
 
+    If profile_name already is the active profile and its rules are unchanged
+    since the last apply (see LAST_SYNC_PATH), the sync is skipped; pass
+    force=True to re-sync anyway (e.g. after rules were edited outside
+    FWAssist).
+
     UI or CLI should call this when the user selects a profile.
+    Returns the updated FullConfig, so callers need not load it again.
     """
-    cfg = load_config()
-
-    if profile_name not in cfg.profiles:
-        raise ValueError(f"Profile '{profile_name}' not found")
-
-    cfg.active_profile = profile_name
-    save_config(cfg)
+    with mutate_config() as cfg:
+        profile = _require_profile(cfg, profile_name)
+        was_active = cfg.active_profile == profile_name
+        cfg.active_profile = profile_name
 
     log_event(
         "PROFILE_APPLIED",
@@ -70,8 +184,20 @@ def apply_profile(profile_name: str) -> None:
         {"profile": profile_name},
     )
 
-    # Enforce the profile via Windows Firewall
-    sync_profile_to_windows_firewall(profile_name)
+    last_sync = f"{profile_name}\n{_profile_sync_digest(profile)}"
+    if was_active and not force and _read_last_sync() == last_sync:
+        log_event(
+            "PROFILE_SYNC_SKIPPED",
+            f"Profile '{profile_name}' unchanged since last sync",
+            {"profile": profile_name},
+        )
+        return cfg
+
+    # Enforce the profile via Windows Firewall (queued behind any background
+    # sync, then waited for)
+    _submit_sync(profile_name, cfg, record_digest=True).result()
+    # The sync may have saved cleared temporary allows as a new config object
+    return load_config()
 
 
 def set_app_action_in_profile(
@@ -87,26 +213,22 @@ def set_app_action_in_profile(
     Caller should then save_config(cfg) and (optionally) apply_profile(cfg.active_profile)
     to sync changes to Windows Firewall.
     """
-    if profile_name not in cfg.profiles:
-        raise ValueError(f"Profile '{profile_name}' not found")
-
-    exe_path_resolved = str(Path(exe_path).resolve())
-    profile = cfg.profiles[profile_name]
+    profile = _require_profile(cfg, profile_name)
+    exe_path_resolved = resolve_exe_path(exe_path)
 
-    rule = profile.app_rules.get(exe_path_resolved)
+    rule = profile.find_rule(exe_path_resolved)
     if rule is None:
         rule = AppRule(
             app_exe_path=exe_path_resolved,
             action=action,
             direction="out",
-            temporary_until=None,
         )
-        profile.app_rules[exe_path_resolved] = rule
+        profile.set_rule(exe_path_resolved, rule)
         change_type = "created"
     else:
         rule.action = action
         # When user explicitly sets rule, clear any previous temporary allowance
-        rule.temporary_until = None
+        rule.temporary_until_epoch = None
         change_type = "updated"
 
     log_event(
@@ -128,89 +250,114 @@ def set_app_action_in_profile(
 def set_temporary_allow_in_active_profile(
     exe_path: str,
     minutes: int = 60,
-) -> None:
+) -> "Future[None]":
     """
     Mark a BLOCK rule for this app in the ACTIVE profile as temporarily allowed
     for 'minutes' minutes.
 
     Semantics:
       - The underlying rule.action remains "block".
-      - temporary_until is set to now + minutes.
+      - temporary_until_epoch is set to now + minutes.
       - sync_profile_to_windows_firewall() treats this as ALLOW until expiry.
       - After expiry (next sync), it behaves as a normal block again.
+
+    The config is saved before this returns; the firewall sync runs in the
+    background. Returns its Future (call .result() to wait for it).
     """
-    cfg = load_config()
-    profile = get_active_profile(cfg)
-    exe_path_resolved = str(Path(exe_path).resolve())
-
-    rule = profile.app_rules.get(exe_path_resolved)
-    if rule is None or rule.action != "block":
-        raise ValueError(
-            f"App '{exe_path_resolved}' is not currently BLOCKED in active profile "
-            f"'{profile.name}', so temporary allow does not apply."
-        )
+    return set_temporary_allow_many_in_active_profile([exe_path], minutes=minutes)
 
-    until_dt = _dt.datetime.utcnow() + _dt.timedelta(minutes=minutes)
-    until_str = until_dt.isoformat(timespec="seconds")
-    rule.temporary_until = until_str
-    save_config(cfg)
 
-    log_event(
-        "APP_TEMP_ALLOW_SET",
-        f"Temporarily allowing {exe_path_resolved} in profile '{profile.name}'",
-        {
-            "profile": profile.name,
-            "exe_path": exe_path_resolved,
-            "temporary_until": until_str,
-            "duration_minutes": minutes,
-        },
-    )
+def set_temporary_allow_many_in_active_profile(
+    exe_paths: Iterable[str],
+    minutes: int = 60,
+) -> "Future[None]":
+    """
+    Like set_temporary_allow_in_active_profile() for several apps at once:
+    the config is saved once and the firewall synced once for all of them.
+    Returns the Future of the background sync.
 
-    # Re-apply profile so firewall immediately unblocks this app.
-    sync_profile_to_windows_firewall(profile.name)
+    Raises ValueError, changing nothing, if any of the apps is not BLOCKED
+    in the active profile.
+    """
+    paths = [resolve_exe_path(p) for p in exe_paths]
+
+    with mutate_config() as cfg:
+        profile = get_active_profile(cfg)
+
+        # Check every app before touching any rule
+        rules: List[AppRule] = []
+        for exe_path_resolved in paths:
+            rule = profile.find_rule(exe_path_resolved)
+            if rule is None or rule.action != "block":
+                raise ValueError(
+                    f"App '{exe_path_resolved}' is not currently BLOCKED in active profile "
+                    f"'{profile.name}', so temporary allow does not apply."
+                )
+            rules.append(rule)
+
+        until_dt = _dt.datetime.now(_dt.timezone.utc) + _dt.timedelta(minutes=minutes)
+        for rule in rules:
+            rule.set_temporary_until(until_dt)
+        until_str = rules[0].temporary_until if rules else None
+
+    for exe_path_resolved in paths:
+        log_event(
+            "APP_TEMP_ALLOW_SET",
+            LazyMessage(
+                "Temporarily allowing %s in profile '%s'", exe_path_resolved, profile.name
+            ),
+            {
+                "profile": profile.name,
+                "exe_path": exe_path_resolved,
+                "temporary_until": until_str,
+                "duration_minutes": minutes,
+            },
+        )
+
+    # Re-apply profile so firewall unblocks these apps, without making the
+    # caller (usually the UI thread) wait for it.
+    future = _submit_sync(profile.name, cfg)
+    future.add_done_callback(_report_sync_error)
+    return future
 
 
 # ---------------------------------------------------------------------------
 # "Why is this app not working?" backend helper
 # ---------------------------------------------------------------------------
 
-def explain_app_in_active_profile(exe_path: str) -> Dict[str, Any]:
-    """
-    Explain how the currently active profile treats the given exe_path.
+class Explanation(NamedTuple):
+    """Result of explain_app_in_active_profile(); see there for the fields."""
+    exe_path: str
+    profile: str
+    profile_display_name: str
+    action: Action
+    direction: Direction
+    temporary_until: Optional[str]
+    reason: str
 
-    Returns a dict with keys:
-      - exe_path
-      - profile
-      - profile_display_name
-      - action           (effective: "allow" or "block", considering temporary_until)
-      - direction        ("in", "out", "both") – if explicit rule, else "out"
-      - temporary_until  (str or None, from the rule if any)
-      - reason           (human-readable explanation)
-    """
-    cfg = load_config()
-    profile = get_active_profile(cfg)
-    exe_path_resolved = str(Path(exe_path).resolve())
-    now = _dt.datetime.utcnow()
+    def to_dict(self) -> Dict[str, Any]:
+        """The explanation as the plain dict older callers expect."""
+        return dict(zip(self._fields, self))
 
-    explicit_rule = profile.app_rules.get(exe_path_resolved)
+
+def _explain(profile: ProfileConfig, exe_path_resolved: str, now: float) -> Explanation:
+    """Explanation for one resolved exe path; now is time.time()."""
+    explicit_rule = profile.find_rule(exe_path_resolved)
 
     if explicit_rule:
         effective_action: Action = explicit_rule.action
         direction = explicit_rule.direction
+        # Formatted for display only; the check below uses the epoch
         temporary_until = explicit_rule.temporary_until
         temp_active = False
 
-        # If there's a temporary_until on a BLOCK rule, and it's still in the future,
+        # If there's a temporary allow on a BLOCK rule, and it's still in the future,
         # treat this as effectively ALLOW for now.
-        if temporary_until and explicit_rule.action == "block":
-            try:
-                expiry = _dt.datetime.fromisoformat(temporary_until)
-                if now < expiry:
-                    effective_action = "allow"
-                    temp_active = True
-            except ValueError:
-                # Ignore malformed timestamps; treat as normal block/allow
-                pass
+        if explicit_rule.action == "block":
+            expiry = explicit_rule.temporary_until_epoch
+            if expiry is not None and now < expiry:
+                effective_action = "allow"
+                temp_active = True
 
         if temp_active:
             reason = (
@@ -224,40 +371,87 @@ def explain_app_in_active_profile(exe_path: str) -> Dict[str, Any]:
                 f"{explicit_rule.action.upper()} ({explicit_rule.direction})"
             )
 
-        explanation: Dict[str, Any] = {
-            "exe_path": exe_path_resolved,
-            "profile": profile.name,
-            "profile_display_name": profile.display_name,
-            "action": effective_action,
-            "direction": direction,
-            "temporary_until": temporary_until,
-            "reason": reason,
-        }
+        explanation = Explanation(
+            exe_path=exe_path_resolved,
+            profile=profile.name,
+            profile_display_name=profile.display_name,
+            action=effective_action,
+            direction=direction,
+            temporary_until=temporary_until,
+            reason=reason,
+        )
     else:
         # No explicit rule: fall back to default_action
-        explanation = {
-            "exe_path": exe_path_resolved,
-            "profile": profile.name,
-            "profile_display_name": profile.display_name,
-            "action": profile.default_action,
-            "direction": "out",
-            "temporary_until": None,
-            "reason": (
+        explanation = Explanation(
+            exe_path=exe_path_resolved,
+            profile=profile.name,
+            profile_display_name=profile.display_name,
+            action=profile.default_action,
+            direction="out",
+            temporary_until=None,
+            reason=(
                 f"No explicit rule in profile '{profile.display_name}'. "
                 f"Using default_action='{profile.default_action}'."
             ),
-        }
+        )
+
+    return explanation
+
+
+def explain_app_in_active_profile(exe_path: str) -> Explanation:
+    """
+    Explain how the currently active profile treats the given exe_path.
+
+    Returns an Explanation (a NamedTuple; .to_dict() for a dict) with fields:
+      - exe_path
+      - profile
+      - profile_display_name
+      - action           (effective: "allow" or "block", considering temporary_until)
+      - direction        ("in", "out", "both") – if explicit rule, else "out"
+      - temporary_until  (str or None, from the rule if any)
+      - reason           (human-readable explanation)
+    """
+    cfg = load_config()
+    profile = get_active_profile_ro(cfg)
+    exe_path_resolved = resolve_exe_path(exe_path)
+    explanation = _explain(profile, exe_path_resolved, time.time())
 
     # Log that someone asked for an explanation
-    log_event(
-        "APP_STATUS_EXPLAINED",
-        f"Explained status for {exe_path_resolved} in profile '{profile.name}'",
-        explanation,
-    )
+    if LOG_EXPLANATIONS and is_event_enabled("APP_STATUS_EXPLAINED"):
+        log_event(
+            "APP_STATUS_EXPLAINED",
+            LazyMessage(
+                "Explained status for %s in profile '%s'", exe_path_resolved, profile.name
+            ),
+            explanation.to_dict(),
+        )
 
     return explanation
 
 
+def explain_apps(exe_paths: Iterable[str]) -> List[Explanation]:
+    """
+    explain_app_in_active_profile() for many apps at once: the config,
+    active profile and current time are looked up once, and a single
+    APP_STATUS_EXPLAINED_BATCH event is logged instead of one per app.
+    """
+    cfg = load_config()
+    profile = get_active_profile_ro(cfg)
+    now = time.time()
+    explanations = [_explain(profile, resolve_exe_path(p), now) for p in exe_paths]
+
+    if LOG_EXPLANATIONS and is_event_enabled("APP_STATUS_EXPLAINED_BATCH"):
+        log_event(
+            "APP_STATUS_EXPLAINED_BATCH",
+            LazyMessage(
+                "Explained status for %d apps in profile '%s'", len(explanations), profile.name
+            ),
+            {"profile": profile.name, "count": len(explanations)},
+        )
+
+    return explanations
+
+
 # ---------------------------------------------------------------------------
 # Helper for CLI: list rules for a profile
 # ---------------------------------------------------------------------------
@@ -268,45 +462,71 @@ def _list_rules_for_profile(profile_name: str) -> None:
     Intended only for the __main__ CLI.
     """
     cfg = load_config()
-    if profile_name not in cfg.profiles:
+    profile = cfg.profiles.get(profile_name)
+    if profile is None:
         print(f"Profile '{profile_name}' not found.")
         return
 
-    profile = cfg.profiles[profile_name]
-    now = _dt.datetime.utcnow()
+    now = time.time()
 
-    print(f"Profile: {profile.display_name} ({profile.name})")
-    print(f"default_action = {profile.default_action}")
-    print("Rules:")
+    lines = [
+        f"Profile: {profile.display_name} ({profile.name})\n"
+        f"default_action = {profile.default_action}\n"
+        "Rules:\n"
+    ]
 
     if not profile.app_rules:
-        print("  (no explicit app rules)")
-        return
+        lines.append("  (no explicit app rules)\n")
 
+    # Collected and written at once: large profiles would otherwise pay
+    # for five print() calls per rule.
     for exe_path, rule in profile.app_rules.items():
         eff_action: Action = rule.action
         temp_note = ""
-        if rule.temporary_until and rule.action == "block":
-            try:
-                expiry = _dt.datetime.fromisoformat(rule.temporary_until)
-                if now < expiry:
-                    eff_action = "allow"
-                    temp_note = f" (TEMP ALLOW until {rule.temporary_until})"
-            except ValueError:
-                pass
-
-        print(f"  {exe_path}")
-        print(f"    base_action   = {rule.action}")
-        print(f"    direction     = {rule.direction}")
-        print(f"    effective_act = {eff_action}{temp_note}")
-        print(f"    temporary_until = {rule.temporary_until}")
+        if rule.action == "block":
+            expiry = rule.temporary_until_epoch
+            if expiry is not None and now < expiry:
+                eff_action = "allow"
+                temp_note = f" (TEMP ALLOW until {rule.temporary_until})"
+
+        lines.append(
+            f"  {exe_path}\n"
+            f"    base_action   = {rule.action}\n"
+            f"    direction     = {rule.direction}\n"
+            f"    effective_act = {eff_action}{temp_note}\n"
+            f"    temporary_until = {rule.temporary_until}\n"
+        )
+
+    _write_stdout("".join(lines))
+
+
+def _write_stdout(text: str) -> None:
+    """
+    Write text to stdout in one go: encoded once and handed to the binary
+    buffer, skipping TextIOWrapper's per-write work. Falls back to
+    sys.stdout.write() when stdout has no buffer (e.g. under IDLE).
+    """
+    stdout = sys.stdout
+    buffer = getattr(stdout, "buffer", None)
+    if buffer is None:
+        stdout.write(text)
+        return
+
+    if os.linesep != "\n":
+        # Do the "\n" -> "\r\n" translation the text layer would have done
+        text = text.replace("\n", os.linesep)
+    stdout.flush()  # keep anything printed earlier in order
+    buffer.write(text.encode(stdout.encoding or "utf-8", "replace"))
+    buffer.flush()
 
 
 # ---------------------------------------------------------------------------
 # CLI for debug / manual testing (Week 4 backend tooling)
 # ---------------------------------------------------------------------------
 
-if __name__ == "__main__":
+@functools.lru_cache(maxsize=1)
+def _build_parser() -> argparse.ArgumentParser:
+    """Build the CLI parser once; main() reuses it on every call."""
     import argparse
 
     parser = argparse.ArgumentParser(
@@ -320,6 +540,11 @@ if __name__ == "__main__":
         help="Set active profile and sync Windows Firewall.",
     )
     p_apply.add_argument("profile", help="Profile name (e.g. normal, public_wifi, focus)")
+    p_apply.add_argument(
+        "--force",
+        action="store_true",
+        help="Sync to Windows Firewall even if the profile looks unchanged.",
+    )
 
     # explain EXE_PATH
     p_explain = subparsers.add_parser(
@@ -328,6 +553,13 @@ if __name__ == "__main__":
     )
     p_explain.add_argument("exe_path", help="Path to executable to explain")
 
+    # explain-many EXE_PATH [EXE_PATH ...]
+    p_explain_many = subparsers.add_parser(
+        "explain-many",
+        help="Explain how the ACTIVE profile treats several executables.",
+    )
+    p_explain_many.add_argument("exe_paths", nargs="+", help="Paths to executables to explain")
+
     # temp-allow EXE_PATH [--minutes N]
     p_temp = subparsers.add_parser(
         "temp-allow",
@@ -341,6 +573,19 @@ if __name__ == "__main__":
         help="Duration in minutes (default: 60)",
     )
 
+    # temp-allow-many EXE_PATH [EXE_PATH ...] [--minutes N]
+    p_temp_many = subparsers.add_parser(
+        "temp-allow-many",
+        help="Temporarily allow several BLOCKED apps in the ACTIVE profile (one save + sync).",
+    )
+    p_temp_many.add_argument("exe_paths", nargs="+", help="Paths to executables to temp-allow")
+    p_temp_many.add_argument(
+        "--minutes",
+        type=int,
+        default=60,
+        help="Duration in minutes (default: 60)",
+    )
+
     # list-rules PROFILE
     p_list = subparsers.add_parser(
         "list-rules",
@@ -348,26 +593,68 @@ if __name__ == "__main__":
     )
     p_list.add_argument("profile", help="Profile name")
 
-    args = parser.parse_args()
-
-    if args.command == "apply":
-        print("Existing profiles:", ", ".join(load_config().profiles.keys()))
-        apply_profile(args.profile)
-        cfg2 = load_config()
-        print("Active profile is now:", cfg2.active_profile)
-
-    elif args.command == "explain":
-        info = explain_app_in_active_profile(args.exe_path)
-        print("Explanation:")
-        for k, v in info.items():
-            print(f"  {k}: {v}")
-
-    elif args.command == "temp-allow":
-        try:
-            set_temporary_allow_in_active_profile(args.exe_path, minutes=args.minutes)
-            print(f"Temporary allow set for {args.exe_path} in active profile for {args.minutes} minutes.")
-        except Exception as exc:
-            print(f"Error setting temporary allow: {exc}")
-
-    elif args.command == "list-rules":
-        _list_rules_for_profile(args.profile)
\ No newline at end of file
+    return parser
+
+
+def _cmd_apply(args: argparse.Namespace) -> None:
+    print("Existing profiles:", ", ".join(load_config().profiles.keys()))
+    cfg = apply_profile(args.profile, force=args.force)
+    print("Active profile is now:", cfg.active_profile)
+
+
+def _cmd_explain(args: argparse.Namespace) -> None:
+    info = explain_app_in_active_profile(args.exe_path)
+    print("Explanation:")
+    for k, v in zip(info._fields, info):
+        print(f"  {k}: {v}")
+
+
+def _cmd_explain_many(args: argparse.Namespace) -> None:
+    for info in explain_apps(args.exe_paths):
+        print(f"{info.exe_path}: {info.action.upper()} ({info.direction}) - {info.reason}")
+
+
+def _cmd_temp_allow(args: argparse.Namespace) -> None:
+    try:
+        set_temporary_allow_in_active_profile(args.exe_path, minutes=args.minutes).result()
+        print(f"Temporary allow set for {args.exe_path} in active profile for {args.minutes} minutes.")
+    except Exception as exc:
+        print(f"Error setting temporary allow: {exc}")
+
+
+def _cmd_temp_allow_many(args: argparse.Namespace) -> None:
+    try:
+        set_temporary_allow_many_in_active_profile(args.exe_paths, minutes=args.minutes).result()
+        print(
+            f"Temporary allow set for {len(args.exe_paths)} apps in active profile "
+            f"for {args.minutes} minutes."
+        )
+    except Exception as exc:
+        print(f"Error setting temporary allow: {exc}")
+
+
+def _cmd_list_rules(args: argparse.Namespace) -> None:
+    _list_rules_for_profile(args.profile)
+
+
+_CLI_HANDLERS: Dict[str, Callable[[argparse.Namespace], None]] = {
+    "apply": _cmd_apply,
+    "explain": _cmd_explain,
+    "explain-many": _cmd_explain_many,
+    "temp-allow": _cmd_temp_allow,
+    "temp-allow-many": _cmd_temp_allow_many,
+    "list-rules": _cmd_list_rules,
+}
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    CLI entry point. argv defaults to sys.argv[1:]; pass a list to run a
+    command in-process (the parser is only built once).
+    """
+    args = _build_parser().parse_args(argv)
+    _CLI_HANDLERS[args.command](args)
+
+
+if __name__ == "__main__":
+    main()
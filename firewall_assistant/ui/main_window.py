@@ -3,9 +3,11 @@
 from __future__ import annotations
 
 import tkinter as tk
+from concurrent.futures import Future
 from tkinter import ttk, messagebox
 from typing import List, Optional
 import datetime as _dt
+import time
 
 from ..config import load_config, save_config
 from ..profiles import (
@@ -252,9 +254,8 @@ class MainWindow(tk.Tk):
         Applies the profile (updates Windows Firewall) and reloads config.
         """
         try:
-            apply_profile(profile_name)
-            # Reload config so self.cfg reflects any changes
-            self.cfg = load_config()
+            # apply_profile returns the updated config; no need to reload it
+            self.cfg = apply_profile(profile_name)
             self.current_profile_name = self.cfg.active_profile
             self.profile_var.set(self.current_profile_name)
             self._update_active_profile_label()
@@ -306,7 +307,7 @@ class MainWindow(tk.Tk):
             # Fallback: try to restore active profile
             profile = get_active_profile(self.cfg)
 
-        now = _dt.datetime.utcnow()
+        now = time.time()
 
         # Build rows
         apps_list: List[AppInfo] = sorted(
@@ -316,21 +317,18 @@ class MainWindow(tk.Tk):
 
         for app in apps_list:
             exe_path = app.exe_path
-            rule = profile.app_rules.get(exe_path)
+            rule = profile.find_rule(exe_path)
             status_display: str
 
             if rule is not None:
                 status = rule.action
                 temp_active = False
 
-                if rule.temporary_until and rule.action == "block":
-                    try:
-                        expiry = _dt.datetime.fromisoformat(rule.temporary_until)
-                        if now < expiry:
-                            # Temporarily allowed
-                            temp_active = True
-                    except ValueError:
-                        pass
+                if rule.action == "block":
+                    expiry = rule.temporary_until_epoch
+                    if expiry is not None and now < expiry:
+                        # Temporarily allowed
+                        temp_active = True
 
                 if temp_active:
                     status_display = "ALLOW (TEMP)"
@@ -484,12 +482,12 @@ class MainWindow(tk.Tk):
             )
             return
 
-        action = info.get("action", "")
-        direction = info.get("direction", "")
-        profile_name = info.get("profile", "")
-        profile_display = info.get("profile_display_name", profile_name)
-        temporary_until = info.get("temporary_until")
-        reason = info.get("reason", "")
+        action = info.action
+        direction = info.direction
+        profile_name = info.profile
+        profile_display = info.profile_display_name or profile_name
+        temporary_until = info.temporary_until
+        reason = info.reason
 
         msg_lines = [
             f"Profile: {profile_display} ({profile_name})",
@@ -520,7 +518,7 @@ class MainWindow(tk.Tk):
             "Continue?",
         ):
             try:
-                set_temporary_allow_in_active_profile(exe_path, minutes=60)
+                future = set_temporary_allow_in_active_profile(exe_path, minutes=60)
             except ValueError as exc:
                 messagebox.showinfo(
                     "Cannot temporarily allow",
@@ -539,10 +537,33 @@ class MainWindow(tk.Tk):
             self.cfg = load_config()
             self.refresh_apps_table()
 
-            messagebox.showinfo(
-                "Temporary allow set",
-                "This app is now temporarily allowed for 1 hour in the active profile.",
+            # The firewall sync runs in the background: report once it is done
+            self._report_temp_allow_when_done(exe_path, future)
+
+    def _report_temp_allow_when_done(self, exe_path: str, future: Future) -> None:
+        """Poll the temporary-allow sync from the Tk event loop, then report its outcome."""
+        if not future.done():
+            self.after(100, self._report_temp_allow_when_done, exe_path, future)
+            return
+
+        # The sync may have saved cleared temporary allows: pick them up here
+        self.cfg = load_config()
+        self.refresh_apps_table()
+
+        exc = future.exception()
+        if exc is not None:
+            print(f"[UI] Firewall sync after temporary allow for '{exe_path}' failed: {exc}")
+            messagebox.showerror(
+                "Error",
+                "The temporary allow was saved, but applying it to Windows Firewall "
+                f"failed:\n{exc}",
             )
+            return
+
+        messagebox.showinfo(
+            "Temporary allow set",
+            "This app is now temporarily allowed for 1 hour in the active profile.",
+        )
 
     # ------------------------------------------------------------------
     # Logs handling